@@ -1,3 +1,22 @@
 from django.contrib import admin
+from .models import CachedSignatures, BehaviorReport, AnalysisJob
 
-# Register your models here.
+
+@admin.register(CachedSignatures)
+class CachedSignaturesAdmin(admin.ModelAdmin):
+    list_display = ('content_hash', 'parser_version', 'size', 'hits', 'last_used_at')
+    search_fields = ('content_hash',)
+
+
+@admin.register(BehaviorReport)
+class BehaviorReportAdmin(admin.ModelAdmin):
+    list_display = ('name', 'owner', 'signature_count', 'created_at')
+    search_fields = ('name', 'content_hash', 'owner__username')
+    exclude = ('signature_ids',)
+
+
+@admin.register(AnalysisJob)
+class AnalysisJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'owner', 'status', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    search_fields = ('id', 'owner__username')
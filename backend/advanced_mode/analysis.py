@@ -0,0 +1,67 @@
+"""Report analysis shared by ExperimentAnalyzeView and the background jobs"""
+import json
+import os
+from typing import Set, Tuple
+
+from backend.metrics import timed
+from .reports import register_report
+from .utils.core.comparator import Comparator
+from .utils.core.scorer import Scorer
+
+# (file name, content hash, parsed signatures) of a behavior report
+ParsedReport = Tuple[str, str, Set[str]]
+
+
+def load_config():
+    config_path = os.path.join(os.path.dirname(__file__), 'utils', 'config.json')
+    try:
+        with open(config_path, 'r') as f:
+            return json.load(f)
+    except:
+        return {"scorings": {"weight_vt": 0.7, "weight_ssdeep": 0.3}}
+
+
+def analyze_reports(owner, original: ParsedReport, variant: ParsedReport,
+                    rate_original: float, rate_variant: float,
+                    original_file_path=None, variant_file_path=None) -> dict:
+    """Register both reports, then score the variant against the original"""
+    name_original, hash_original, sigs_original = original
+    name_variant, hash_variant, sigs_variant = variant
+
+    # Keep both reports for cohort comparisons (ReportSimilarityView)
+    report_original = register_report(owner, name_original, hash_original, sigs_original)
+    report_variant = register_report(owner, name_variant, hash_variant, sigs_variant)
+
+    common = sigs_original.intersection(sigs_variant)
+    total = sigs_original.union(sigs_variant)
+    similarity = len(common) / len(total) if len(total) > 0 else 0
+    is_functional = similarity >= 0.6
+
+    ssdeep_dist = 0
+    if original_file_path and variant_file_path:
+        # Feature: Calculate explicit SSDeep distance
+        comparator = Comparator()
+        with timed("fuzzy_comparison"):
+            ssdeep_dist = comparator.calculate_distance(original_file_path, variant_file_path)
+
+    # Load Config for weights
+    config = load_config()
+    weights = config.get("scorings", {"weight_vt": 0.7, "weight_ssdeep": 0.3})
+
+    with timed("scoring"):
+        scorer = Scorer(weight_vt=weights["weight_vt"], weight_ssdeep=weights["weight_ssdeep"])
+        score_details = scorer.calculate_detailed_score(
+            original_vt_rate=rate_original / 100.0,
+            variant_vt_rate=rate_variant / 100.0,
+            ssdeep_distance=ssdeep_dist,
+            is_functional=is_functional
+        )
+
+    return {
+        "scores": score_details,
+        "similarity_percent": similarity * 100,
+        "report_original_id": report_original.id,
+        "report_variant_id": report_variant.id,
+        "signatures_original": list(sigs_original),
+        "signatures_variant": list(sigs_variant)
+    }
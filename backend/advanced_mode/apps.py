@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class AdvancedModeConfig(AppConfig):
     name = 'advanced_mode'
+
+    def ready(self):
+        from . import signals  # noqa: F401
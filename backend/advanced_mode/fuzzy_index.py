@@ -0,0 +1,140 @@
+"""Similarity search over the ssdeep hashes of stored files"""
+from collections import defaultdict
+from typing import List, Optional
+
+from django.db.models import Count, Q
+
+from backend.metrics import timed
+from files.models import File
+from users.models import UserFile
+from .models import FuzzyHash, FuzzyHashGram
+from .utils.core.comparator import Comparator
+from .utils.core.fuzzy_hash import index_keys, parse_hash
+
+# Candidates (ranked by shared n-grams) that get a full ssdeep comparison
+MAX_CANDIDATES = 500
+
+
+@timed("db_write")
+def index_hash(fuzzy_hash: str) -> Optional[FuzzyHash]:
+    """Add a hash to the index; hashes already indexed are left as they are"""
+    parsed = parse_hash(fuzzy_hash)
+    if parsed is None:
+        return None
+    entry, created = FuzzyHash.objects.get_or_create(ssdeep=fuzzy_hash, defaults={'block_size': parsed[0]})
+    if created:
+        FuzzyHashGram.objects.bulk_create(
+            [FuzzyHashGram(fuzzy_hash=entry, block_size=bs, gram=gram) for bs, gram in index_keys(fuzzy_hash)],
+            batch_size=500,
+        )
+    return entry
+
+
+def hash_stored_file(instance) -> str:
+    """ssdeep hash of the file of a UserFile/File ('' if unavailable)"""
+    try:
+        with timed("hashing"):
+            return Comparator.hash_file(instance.file.path) or ""
+    except OSError:
+        return ""
+
+
+def index_stored_file(instance) -> str:
+    """Compute (if needed), save and index the ssdeep hash of a UserFile/File"""
+    fuzzy_hash = instance.ssdeep
+    if not fuzzy_hash and instance.file:
+        fuzzy_hash = hash_stored_file(instance)
+        if fuzzy_hash:
+            type(instance).objects.filter(pk=instance.pk).update(ssdeep=fuzzy_hash)
+            instance.ssdeep = fuzzy_hash
+    if fuzzy_hash:
+        index_hash(fuzzy_hash)
+    return fuzzy_hash
+
+
+def index_stored_files(instances) -> None:
+    """
+    index_stored_file for saved rows of one model: computed hashes are saved
+    with one bulk_update and each distinct hash is indexed once.
+    """
+    hashed = []
+    for instance in instances:
+        if not instance.ssdeep and instance.file:
+            instance.ssdeep = hash_stored_file(instance)
+            if instance.ssdeep:
+                hashed.append(instance)
+    if hashed:
+        with timed("db_write"):
+            type(hashed[0]).objects.bulk_update(hashed, ['ssdeep'], batch_size=500)
+    for fuzzy_hash in {instance.ssdeep for instance in instances if instance.ssdeep}:
+        index_hash(fuzzy_hash)
+
+
+@timed("fuzzy_comparison")
+def similar_hashes(fuzzy_hash: str, k: int = 10, min_score: int = 1) -> List[dict]:
+    """
+    Top-k indexed hashes most similar to `fuzzy_hash`. Only hashes sharing
+    a (block size, 7-gram) key are compared, never the whole index.
+    Without the ssdeep module, candidates are ranked by shared n-grams and
+    `score` is None.
+    """
+    by_block = defaultdict(list)
+    for block_size, gram in index_keys(fuzzy_hash):
+        by_block[block_size].append(gram)
+    if not by_block:
+        return []
+
+    lookup = Q()
+    for block_size, grams in by_block.items():
+        lookup |= Q(block_size=block_size, gram__in=grams)
+    candidates = (
+        FuzzyHashGram.objects.filter(lookup)
+        .values('fuzzy_hash_id')
+        .annotate(shared=Count('id'))
+        .order_by('-shared')[:MAX_CANDIDATES]
+    )
+    shared = {row['fuzzy_hash_id']: row['shared'] for row in candidates}
+    hashes = FuzzyHash.objects.filter(id__in=shared).values_list('id', 'ssdeep')
+
+    if not Comparator.available():
+        results = [{"ssdeep": h, "score": None, "shared_ngrams": shared[pk]} for pk, h in hashes]
+        results.sort(key=lambda r: -r["shared_ngrams"])
+    else:
+        results = [
+            {"ssdeep": h, "score": Comparator.compare_hashes(fuzzy_hash, h), "shared_ngrams": shared[pk]}
+            for pk, h in hashes
+        ]
+        results = [r for r in results if r["score"] >= min_score]
+        results.sort(key=lambda r: (-r["score"], -r["shared_ngrams"]))
+    return results[:k]
+
+
+def similar_files(fuzzy_hash: str, user=None, k: int = 10, exclude=None) -> List[dict]:
+    """
+    Top-k stored files (UserFile and File) most similar to `fuzzy_hash`.
+    Non-staff users only see their own files. `exclude` is a (kind, id)
+    pair, used to leave out the file the query was made from.
+    """
+    # Rank every candidate: the best ones may belong to files the user can't see
+    matches = similar_hashes(fuzzy_hash, k=MAX_CANDIDATES)
+    scores = {m["ssdeep"]: m["score"] for m in matches}
+    rank = {m["ssdeep"]: i for i, m in enumerate(matches)}
+    if not scores:
+        return []
+
+    user_files = UserFile.objects.filter(ssdeep__in=scores)
+    files = File.objects.filter(ssdeep__in=scores)
+    if user is not None and not user.is_staff:
+        user_files = user_files.filter(user=user)
+        files = files.filter(owner=user)
+
+    results = [
+        {"kind": "user_file", "id": f.id, "name": f.original_name or f.file.name.split("/")[-1], "ssdeep": f.ssdeep, "score": scores[f.ssdeep]}
+        for f in user_files
+    ] + [
+        {"kind": "file", "id": f.id, "name": f.name, "ssdeep": f.ssdeep, "score": scores[f.ssdeep]}
+        for f in files
+    ]
+    results = [r for r in results if (r["kind"], r["id"]) != exclude]
+    results.sort(key=lambda r: rank[r["ssdeep"]])
+    return results[:k]
@@ -0,0 +1,156 @@
+"""
+Background report analysis (AnalysisJob) on a local worker pool.
+
+Jobs are rows in the database, so there is no broker to run: a thread pool
+drives each job (cache lookups, database writes, scoring) and hands report
+parsing, the pandas-heavy part, to a pool of worker processes. Polling reads
+the stored result and never recomputes it.
+"""
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+from backend.metrics import timed
+from .analysis import analyze_reports
+from .models import AnalysisJob
+from .signature_cache import get_signature_cache
+from .utils.core.excel_behavior_parser import ExcelBehaviorParser
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 2
+
+# 'process': parse in worker processes, 'thread': parse in the job's thread,
+# 'inline': run jobs synchronously at submission (tests, debugging)
+EXECUTORS = ('process', 'thread', 'inline')
+
+_executor: Optional[ThreadPoolExecutor] = None
+_parser_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_options() -> dict:
+    options = getattr(settings, 'ANALYSIS_JOBS', {})
+    workers = options.get('WORKERS', DEFAULT_WORKERS)
+    executor = options.get('EXECUTOR', 'process')
+    if executor not in EXECUTORS:
+        raise ValueError(f"ANALYSIS_JOBS['EXECUTOR'] must be one of {EXECUTORS}, not {executor!r}")
+    return {
+        'WORKERS': workers,
+        'PARSER_PROCESSES': options.get('PARSER_PROCESSES', workers),
+        'EXECUTOR': executor,
+    }
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _pool_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=get_options()['WORKERS'], thread_name_prefix='analysis-job'
+            )
+        return _executor
+
+
+def _get_parser_pool() -> ProcessPoolExecutor:
+    global _parser_pool
+    with _pool_lock:
+        if _parser_pool is None:
+            # spawn: forking a process that runs threads is unsafe, and it is
+            # the only start method on Windows anyway
+            _parser_pool = ProcessPoolExecutor(
+                max_workers=get_options()['PARSER_PROCESSES'],
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _parser_pool
+
+
+def submit(job: AnalysisJob):
+    """Queue `job`; with the 'inline' executor it has run when this returns"""
+    if get_options()['EXECUTOR'] == 'inline':
+        run_job(job.pk)
+    else:
+        _get_executor().submit(_run_in_thread, job.pk)
+
+
+def _run_in_thread(job_id):
+    close_old_connections()
+    try:
+        run_job(job_id)
+    finally:
+        connection.close()
+
+
+def _parse_reports(paths):
+    """Signatures for each {content_hash, path}; cache misses are parsed in parallel"""
+    cache = get_signature_cache()
+    signatures = [cache.get(report['content_hash']) for report in paths]
+    missing = [i for i, sigs in enumerate(signatures) if sigs is None]
+    if not missing:
+        return signatures
+
+    # Timed here: durations measured in the worker processes would be lost
+    with timed("report_parsing"):
+        if get_options()['EXECUTOR'] == 'process':
+            pool = _get_parser_pool()
+            futures = {i: pool.submit(ExcelBehaviorParser.extract_signatures, paths[i]['path']) for i in missing}
+            parsed = {i: future.result() for i, future in futures.items()}
+        else:
+            parsed = {i: ExcelBehaviorParser.extract_signatures(paths[i]['path']) for i in missing}
+
+    for i, sigs in parsed.items():
+        # An empty set usually means the parser failed; don't pin it
+        if sigs:
+            cache.set(paths[i]['content_hash'], sigs)
+        signatures[i] = sigs
+    return signatures
+
+
+def run_job(job_id):
+    """Run a queued job and store its result; jobs already claimed are skipped"""
+    claimed = AnalysisJob.objects.filter(pk=job_id, status=AnalysisJob.QUEUED).update(
+        status=AnalysisJob.RUNNING, started_at=timezone.now()
+    )
+    if not claimed:
+        return
+
+    job = AnalysisJob.objects.select_related('owner').get(pk=job_id)
+    params = job.params
+    try:
+        original, variant = params['original'], params['variant']
+        sigs_original, sigs_variant = _parse_reports([original, variant])
+        result = analyze_reports(
+            job.owner,
+            (original['name'], original['content_hash'], sigs_original),
+            (variant['name'], variant['content_hash'], sigs_variant),
+            params['rate_original'],
+            params['rate_variant'],
+            params.get('original_file_path'),
+            params.get('variant_file_path'),
+        )
+    except Exception as e:
+        # The message can hold server paths and internals: it goes to the log only,
+        # the client sees the exception class
+        logger.exception("Analysis job %s failed", job_id)
+        AnalysisJob.objects.filter(pk=job_id).update(
+            status=AnalysisJob.FAILED, error=f"Analysis failed ({type(e).__name__})", finished_at=timezone.now()
+        )
+        return
+
+    job.status = AnalysisJob.DONE
+    job.result = result
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'result', 'finished_at'])
+
+
+def requeue_interrupted() -> int:
+    """Put back in the queue the jobs a restart left 'running'"""
+    return AnalysisJob.objects.filter(status=AnalysisJob.RUNNING).update(
+        status=AnalysisJob.QUEUED, started_at=None
+    )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from files.models import File
+from users.models import UserFile
+from advanced_mode.fuzzy_index import index_stored_file
+
+
+class Command(BaseCommand):
+    help = "Compute and index the ssdeep hash of stored files (UserFile and File) that don't have one yet"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Also re-index files that already have a hash")
+
+    def handle(self, *args, **options):
+        for model in (UserFile, File):
+            queryset = model.objects.all() if options['all'] else model.objects.filter(ssdeep="")
+            indexed = 0
+            for instance in queryset.iterator():
+                if index_stored_file(instance):
+                    indexed += 1
+            self.stdout.write(f"{model.__name__}: {indexed} file(s) indexed")
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from advanced_mode.jobs import requeue_interrupted, run_job
+from advanced_mode.models import AnalysisJob
+
+
+class Command(BaseCommand):
+    help = "Run queued analysis jobs, e.g. those left behind when the server restarted"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requeue', action='store_true', help="Also re-run jobs interrupted while running")
+
+    def handle(self, *args, **options):
+        if options['requeue']:
+            self.stdout.write(f"{requeue_interrupted()} interrupted job(s) requeued")
+        pending = AnalysisJob.objects.filter(status=AnalysisJob.QUEUED).order_by('created_at')
+        done = failed = 0
+        for job_id in pending.values_list('id', flat=True):
+            run_job(job_id)
+            if AnalysisJob.objects.filter(pk=job_id, status=AnalysisJob.DONE).exists():
+                done += 1
+            else:
+                failed += 1
+        self.stdout.write(f"{done} job(s) done, {failed} failed")
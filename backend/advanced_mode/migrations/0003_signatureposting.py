@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:39
+
+import django.db.models.deletion
+import numpy as np
+from django.db import migrations, models
+
+
+def index_existing_reports(apps, schema_editor):
+    BehaviorReport = apps.get_model('advanced_mode', 'BehaviorReport')
+    SignaturePosting = apps.get_model('advanced_mode', 'SignaturePosting')
+    for report in BehaviorReport.objects.only('id', 'signature_ids').iterator():
+        ids = np.frombuffer(bytes(report.signature_ids), dtype='<u4')
+        SignaturePosting.objects.bulk_create(
+            [SignaturePosting(signature_id=int(i), report_id=report.id) for i in ids],
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('advanced_mode', '0002_signature_behaviorreport'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SignaturePosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='postings', to='advanced_mode.behaviorreport')),
+                ('signature', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='postings', to='advanced_mode.signature')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('signature', 'report'), name='unique_posting')],
+            },
+        ),
+        migrations.RunPython(index_existing_reports, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('advanced_mode', '0003_signatureposting'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FuzzyHash',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ssdeep', models.CharField(max_length=128, unique=True)),
+                ('block_size', models.PositiveIntegerField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='FuzzyHashGram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('block_size', models.PositiveIntegerField()),
+                ('gram', models.BigIntegerField()),
+                ('fuzzy_hash', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='grams', to='advanced_mode.fuzzyhash')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['block_size', 'gram'], name='fuzzy_gram_lookup')],
+            },
+        ),
+    ]
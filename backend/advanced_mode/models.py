@@ -1,3 +1,129 @@
+import uuid
+
 from django.db import models
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+
+# Persistent tier of the behavior signature cache (see signature_cache.py)
+class CachedSignatures(models.Model):
+    # SHA-256 of the raw report bytes
+    content_hash = models.CharField(max_length=64)
+
+    # Parser version that produced the signatures; other versions are stale
+    parser_version = models.CharField(max_length=16)
+
+    signatures = models.JSONField(default=list)
+
+    # Approximate payload size in bytes, used for size-based eviction
+    size = models.PositiveIntegerField(default=0)
+
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['content_hash', 'parser_version'], name='unique_signatures_per_version'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.content_hash[:12]} (v{self.parser_version}, {len(self.signatures)} signatures)"
+
+
+# Global vocabulary: every behavior signature gets a stable integer id
+class Signature(models.Model):
+    name = models.TextField(unique=True)
+
+    def __str__(self):
+        return self.name
+
+
+# A parsed sandbox report, stored as a sorted array of Signature ids
+class BehaviorReport(models.Model):
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="behavior_reports")
+    name = models.CharField(max_length=255)
+    content_hash = models.CharField(max_length=64)
+
+    # Little-endian uint32 array of Signature ids (see reports.encode_ids)
+    signature_ids = models.BinaryField()
+    signature_count = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'content_hash'], name='unique_report_per_owner'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.signature_count} signatures)"
+
+
+# Inverted index: one row per (signature, report) pair
+class SignaturePosting(models.Model):
+    signature = models.ForeignKey(Signature, on_delete=models.CASCADE, related_name="postings")
+    report = models.ForeignKey(BehaviorReport, on_delete=models.CASCADE, related_name="postings")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['signature', 'report'], name='unique_posting'),
+        ]
+
+
+# Fuzzy-hash similarity index: distinct ssdeep hashes of stored files
+class FuzzyHash(models.Model):
+    ssdeep = models.CharField(max_length=128, unique=True)
+    block_size = models.PositiveIntegerField()
+
+    def __str__(self):
+        return self.ssdeep
+
+
+# (block size, 7-gram) keys of each FuzzyHash, used for candidate filtering
+class FuzzyHashGram(models.Model):
+    fuzzy_hash = models.ForeignKey(FuzzyHash, on_delete=models.CASCADE, related_name="grams")
+    block_size = models.PositiveIntegerField()
+    gram = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['block_size', 'gram'], name='fuzzy_gram_lookup'),
+        ]
+
+
+# Report analysis run by the background worker pool (see jobs.py)
+class AnalysisJob(models.Model):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="analysis_jobs")
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=QUEUED, db_index=True)
+
+    # Stored report paths/hashes, VT rates and sample paths
+    params = models.JSONField(default=dict)
+
+    # Same payload as ExperimentAnalyzeView, kept so polling never recomputes it
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
 
-# Create your models here.
+    def __str__(self):
+        return f"{self.id} ({self.status})"
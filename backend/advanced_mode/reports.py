@@ -0,0 +1,93 @@
+"""Behavior report registry: signature interning and compact id arrays"""
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING, Dict, Iterable, List
+
+if TYPE_CHECKING:
+    import numpy as np  # imported on first use: most workers never touch reports
+
+from backend.metrics import timed
+from .models import BehaviorReport, Signature
+from .signature_index import index_report
+
+# SQLite caps the number of bound parameters per query
+QUERY_CHUNK = 500
+
+# Signature ids never change once assigned, so the name -> id map is safe to keep
+_vocabulary: Dict[str, int] = {}
+_vocabulary_lock = threading.Lock()
+
+
+def intern_signatures(names: Iterable[str]) -> np.ndarray:
+    """Return the sorted Signature ids for `names`, creating missing entries"""
+    import numpy as np
+
+    names = set(names)
+    with _vocabulary_lock:
+        missing = [name for name in names if name not in _vocabulary]
+
+    if missing:
+        found = {}
+        for i in range(0, len(missing), QUERY_CHUNK):
+            found.update(Signature.objects.filter(name__in=missing[i:i + QUERY_CHUNK]).values_list('name', 'id'))
+        new = [name for name in missing if name not in found]
+        if new:
+            Signature.objects.bulk_create([Signature(name=name) for name in new], ignore_conflicts=True)
+            for i in range(0, len(new), QUERY_CHUNK):
+                found.update(Signature.objects.filter(name__in=new[i:i + QUERY_CHUNK]).values_list('name', 'id'))
+        with _vocabulary_lock:
+            _vocabulary.update(found)
+
+    with _vocabulary_lock:
+        ids = [_vocabulary[name] for name in names]
+    return np.array(sorted(ids), dtype='<u4')
+
+
+def encode_ids(ids: np.ndarray) -> bytes:
+    import numpy as np
+    return np.asarray(ids, dtype='<u4').tobytes()
+
+
+def decode_ids(data) -> np.ndarray:
+    import numpy as np
+    return np.frombuffer(bytes(data), dtype='<u4')
+
+
+@timed("db_write")
+def register_report(owner, name: str, content_hash: str, signatures: Iterable[str]) -> BehaviorReport:
+    """
+    Store a parsed report for `owner` and add it to the signature index.
+    The same content is only stored once per owner, except that a stored
+    report without signatures (failed parse) is replaced by a later
+    non-empty parse of the same content.
+    """
+    signatures = set(signatures)
+    report = BehaviorReport.objects.filter(owner=owner, content_hash=content_hash).first()
+    if report is not None and (report.signature_count or not signatures):
+        return report
+
+    ids = intern_signatures(signatures)
+    if report is not None:
+        report.signature_ids = encode_ids(ids)
+        report.signature_count = len(ids)
+        report.save(update_fields=['signature_ids', 'signature_count'])
+        index_report(report, ids)
+        return report
+
+    report, created = BehaviorReport.objects.get_or_create(
+        owner=owner,
+        content_hash=content_hash,
+        defaults={
+            'name': name[:255],
+            'signature_ids': encode_ids(ids),
+            'signature_count': len(ids),
+        },
+    )
+    if created:
+        index_report(report, ids)
+    return report
+
+
+def load_id_arrays(reports: List[BehaviorReport]) -> List[np.ndarray]:
+    return [decode_ids(report.signature_ids) for report in reports]
@@ -0,0 +1,25 @@
+from rest_framework import serializers
+from .models import BehaviorReport, AnalysisJob
+
+
+class BehaviorReportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BehaviorReport
+        fields = ['id', 'name', 'signature_count', 'created_at']
+
+
+class AnalysisJobSerializer(serializers.ModelSerializer):
+    job_id = serializers.UUIDField(source='id', read_only=True)
+
+    class Meta:
+        model = AnalysisJob
+        fields = ['job_id', 'status', 'created_at', 'started_at', 'finished_at', 'result', 'error']
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Only meaningful once the job is over
+        if instance.status != AnalysisJob.DONE:
+            data.pop('result')
+        if instance.status != AnalysisJob.FAILED:
+            data.pop('error')
+        return data
@@ -0,0 +1,23 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from files.models import File
+from users.history import files_recorded
+from users.models import UserFile
+from .fuzzy_index import index_stored_file, index_stored_files
+
+
+@receiver(post_save, sender=UserFile)
+@receiver(post_save, sender=File)
+def index_new_file(sender, instance, created, **kwargs):
+    """Hash each stored file once, so similarity searches never re-read it"""
+    if created:
+        index_stored_file(instance)
+
+
+@receiver(files_recorded)
+def index_recorded_files(sender, instances, **kwargs):
+    # Hashing reads every file: do it after record_files() commits, so its
+    # transaction (and the SQLite write lock) is never held during file I/O
+    transaction.on_commit(lambda: index_stored_files(instances))
@@ -0,0 +1,179 @@
+"""Two-tier cache of parsed behavior signatures, keyed by report content hash"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Set
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from backend.metrics import Counter, registry, timed
+from .models import CachedSignatures
+from .utils.core.excel_behavior_parser import PARSER_VERSION
+
+DEFAULT_MEMORY_ENTRIES = 256
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Memory-tier hits refresh the database row's last_used_at at most this often
+TOUCH_INTERVAL = 60
+
+LOOKUPS = registry.register(Counter(
+    "shapeshifter_signature_cache_lookups", "Signature cache lookups by tier that answered.", ("tier",),
+))
+
+# Eviction trims the database tier to this fraction of max_bytes, so a full
+# cache isn't trimmed again on every write
+EVICT_TO = 0.9
+
+
+class SignatureCache:
+    """
+    In-process LRU tier in front of a database tier (CachedSignatures).
+
+    Entries are keyed by (content_hash, parser_version), so bumping
+    PARSER_VERSION makes every stored entry unreachable; stale rows are
+    purged by the first write of each process.
+
+    The database tier is trimmed to max_bytes, least recently used first.
+    Its size is tracked as a running total, recomputed with one aggregate
+    only when the total goes over the limit.
+    """
+
+    def __init__(self, memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+                 max_bytes: int = DEFAULT_MAX_BYTES, parser_version: str = PARSER_VERSION):
+        self.memory_entries = memory_entries
+        self.max_bytes = max_bytes
+        self.parser_version = parser_version
+        self._memory = OrderedDict()
+        self._touched = {}  # content_hash -> monotonic time of the last last_used_at update
+        self._lock = threading.Lock()
+        self._stale_purged = False
+        self._stored_bytes = None
+
+    def get(self, content_hash: str) -> Optional[Set[str]]:
+        now = time.monotonic()
+        with self._lock:
+            signatures = self._memory.get(content_hash)
+            if signatures is not None:
+                self._memory.move_to_end(content_hash)
+                touch = now - self._touched.get(content_hash, 0) >= TOUCH_INTERVAL
+                if touch:
+                    self._touched[content_hash] = now
+        if signatures is not None:
+            LOOKUPS.inc(tier="memory")
+            # Entries hot in this process must not look stale to the database tier's eviction
+            if touch:
+                CachedSignatures.objects.filter(
+                    content_hash=content_hash, parser_version=self.parser_version
+                ).update(last_used_at=timezone.now())
+            return set(signatures)
+
+        entry = CachedSignatures.objects.filter(
+            content_hash=content_hash, parser_version=self.parser_version
+        ).only('id', 'signatures').first()
+        if entry is None:
+            LOOKUPS.inc(tier="miss")
+            return None
+
+        CachedSignatures.objects.filter(pk=entry.pk).update(
+            hits=F('hits') + 1, last_used_at=timezone.now()
+        )
+        signatures = frozenset(entry.signatures)
+        LOOKUPS.inc(tier="database")
+        with self._lock:
+            self._remember(content_hash, signatures)
+            self._touched[content_hash] = time.monotonic()
+        return set(signatures)
+
+    @timed("db_write")
+    def set(self, content_hash: str, signatures: Set[str]):
+        if not self._stale_purged:
+            self._stale_purged = True
+            CachedSignatures.objects.exclude(parser_version=self.parser_version).delete()
+
+        payload = sorted(signatures)
+        size = len(json.dumps(payload))
+        try:
+            CachedSignatures.objects.update_or_create(
+                content_hash=content_hash,
+                parser_version=self.parser_version,
+                defaults={
+                    'signatures': payload,
+                    'size': size,
+                    'last_used_at': timezone.now(),
+                },
+            )
+        except IntegrityError:
+            pass  # Concurrent insert of the same report
+        with self._lock:
+            self._remember(content_hash, frozenset(payload))
+            self._touched[content_hash] = time.monotonic()
+            if self._stored_bytes is not None:
+                self._stored_bytes += size
+            over_limit = self._stored_bytes is None or self._stored_bytes > self.max_bytes
+        if over_limit:
+            self._evict()
+
+    def get_or_parse(self, content_hash: str, parse: Callable[[], Set[str]]) -> Set[str]:
+        """Return cached signatures, or call `parse()` and cache its result"""
+        signatures = self.get(content_hash)
+        if signatures is None:
+            signatures = parse()
+            # An empty set usually means the parser failed; don't pin it
+            if signatures:
+                self.set(content_hash, signatures)
+        return signatures
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+            self._stored_bytes = 0
+        CachedSignatures.objects.all().delete()
+
+    def _remember(self, content_hash, signatures):
+        # Caller holds self._lock
+        self._memory[content_hash] = signatures
+        self._memory.move_to_end(content_hash)
+        while len(self._memory) > self.memory_entries:
+            evicted, _ = self._memory.popitem(last=False)
+            self._touched.pop(evicted, None)
+
+    def _evict(self):
+        """Delete least recently used rows when the database tier exceeds max_bytes"""
+        # The running total drifts (other processes, replaced rows): measure it
+        total = CachedSignatures.objects.aggregate(total=Sum('size'))['total'] or 0
+        if total > self.max_bytes:
+            excess = total - int(self.max_bytes * EVICT_TO)
+            expired = []
+            # Oldest first, reading only as many rows as needed to free `excess` bytes
+            rows = CachedSignatures.objects.order_by('last_used_at', 'id').values_list('id', 'size')
+            for pk, size in rows.iterator():
+                if excess <= 0:
+                    break
+                expired.append(pk)
+                excess -= size
+                total -= size
+            CachedSignatures.objects.filter(pk__in=expired).delete()
+        with self._lock:
+            self._stored_bytes = total
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_signature_cache() -> SignatureCache:
+    """Process-wide cache configured from settings.SIGNATURE_CACHE"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            options = getattr(settings, 'SIGNATURE_CACHE', {})
+            _cache = SignatureCache(
+                memory_entries=options.get('MEMORY_ENTRIES', DEFAULT_MEMORY_ENTRIES),
+                max_bytes=options.get('MAX_BYTES', DEFAULT_MAX_BYTES),
+            )
+        return _cache
@@ -0,0 +1,54 @@
+"""Inverted index over stored behavior reports (SignaturePosting rows)"""
+from typing import List
+
+from django.db.models import Count, F, QuerySet
+
+from .models import BehaviorReport, Signature, SignaturePosting
+
+BATCH_SIZE = 500
+
+
+def index_report(report: BehaviorReport, signature_ids) -> None:
+    """Add postings for a newly stored report; existing postings are untouched"""
+    SignaturePosting.objects.bulk_create(
+        [SignaturePosting(signature_id=int(i), report_id=report.id) for i in signature_ids],
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def resolve_signatures(names: List[str]) -> List[int]:
+    """Signature ids for `names`; unknown names are dropped"""
+    return list(Signature.objects.filter(name__in=set(names)).values_list('id', flat=True))
+
+
+def reports_matching(reports: QuerySet, names: List[str], match: str = 'all') -> QuerySet:
+    """
+    Restrict `reports` to those containing all (match='all') or any
+    (match='any') of the signatures in `names`.
+    """
+    names = set(names)
+    signature_ids = resolve_signatures(names)
+    if not signature_ids or (match == 'all' and len(signature_ids) < len(names)):
+        return reports.none()
+
+    postings = SignaturePosting.objects.filter(signature_id__in=signature_ids)
+    if match == 'all':
+        postings = postings.values('report_id').annotate(matched=Count('id')).filter(matched=len(signature_ids))
+    return reports.filter(id__in=postings.values('report_id'))
+
+
+def cooccurring_signatures(reports: QuerySet, names: List[str]) -> QuerySet:
+    """
+    Signatures found alongside all of `names`, ranked by the number of
+    reports they share with them. Rows are {'name': ..., 'reports': ...}.
+    """
+    matching = reports_matching(reports, names, match='all')
+    return (
+        SignaturePosting.objects
+        .filter(report_id__in=matching.values('id'))
+        .exclude(signature__name__in=names)
+        .values(name=F('signature__name'))
+        .annotate(reports=Count('report_id'))
+        .order_by('-reports', 'name')
+    )
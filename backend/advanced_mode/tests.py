@@ -1,3 +1,39 @@
+import json
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from . import reports
+from .reports import register_report
+
+
+class ReportSimilarityTests(TestCase):
+    def setUp(self):
+        # Signature ids are rolled back with each test: forget the cached ones
+        reports._vocabulary.clear()
+        self.addCleanup(reports._vocabulary.clear)
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post(self, report_ids):
+        return self.client.post('/api/advanced/reports/similarity/', {'report_ids': report_ids}, format='json')
+
+    def test_condensed_upper_triangle(self):
+        signatures = [{'a', 'b'}, {'b', 'c'}, {'a', 'b'}, set()]
+        ids = [register_report(self.user, f'r{i}.csv', f'{i:064x}', s).id for i, s in enumerate(signatures)]
+
+        response = self.post(ids)
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(data['report_ids'], ids)
+        self.assertEqual(data['similarities'], [[0.3333, 1.0, 0.0], [0.3333, 0.0], [0.0], []])
+        self.assertEqual(data['stats']['pairs'], 6)
 
-# Create your tests here.
+    def test_other_users_reports_are_missing(self):
+        other = User.objects.create_user('bob', 'bob@example.com', 'password')
+        report = register_report(other, 'r.csv', '0' * 64, {'a'})
+        response = self.post([report.id])
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.data['missing'], [report.id])
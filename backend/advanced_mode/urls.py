@@ -1,9 +1,22 @@
 
 from django.urls import path
-from .views import ExperimentStartView, ExperimentMutateView, ExperimentAnalyzeView
+from .views import (
+    ExperimentStartView, ExperimentMutateView, ExperimentAnalyzeView,
+    ReportListView, ReportSimilarityView, ReportSearchView, CooccurringSignaturesView,
+    SimilarFilesView, AnalysisJobSubmitView, AnalysisJobDetailView, ReportDownloadView, VariantDownloadView,
+)
 
 urlpatterns = [
     path('start/', ExperimentStartView.as_view(), name='experiment_start'),
     path('mutate/', ExperimentMutateView.as_view(), name='experiment_mutate'),
+    path('variants/<int:pk>/download/', VariantDownloadView.as_view(), name='variant_download'),
     path('analyze/', ExperimentAnalyzeView.as_view(), name='experiment_analyze'),
+    path('analyze/jobs/', AnalysisJobSubmitView.as_view(), name='analysis_job_submit'),
+    path('analyze/jobs/<uuid:job_id>/', AnalysisJobDetailView.as_view(), name='analysis_job_detail'),
+    path('reports/', ReportListView.as_view(), name='report_list'),
+    path('reports/<int:pk>/download/', ReportDownloadView.as_view(), name='report_download'),
+    path('reports/similarity/', ReportSimilarityView.as_view(), name='report_similarity'),
+    path('reports/search/', ReportSearchView.as_view(), name='report_search'),
+    path('signatures/cooccurring/', CooccurringSignaturesView.as_view(), name='signature_cooccurring'),
+    path('similar/', SimilarFilesView.as_view(), name='similar_files'),
 ]
@@ -1,15 +1,73 @@
 
 """Calcul de distance ssdeep"""
 
-try:
-    import ssdeep
-except ImportError:
-    ssdeep = None
-
+import logging
+import os
+from functools import lru_cache
 from typing import Optional
 
+logger = logging.getLogger(__name__)
+
+_UNLOADED = object()
+_ssdeep = _UNLOADED
+
+
+def get_ssdeep():
+    """Module ssdeep, importé au premier appel (None s'il n'est pas installé)"""
+    global _ssdeep
+    if _ssdeep is _UNLOADED:
+        try:
+            import ssdeep
+        except ImportError:
+            ssdeep = None
+        _ssdeep = ssdeep
+    return _ssdeep
+
+
 class Comparator:
     """Compare deux fichiers binaires avec ssdeep"""
+
+    @staticmethod
+    def available() -> bool:
+        return get_ssdeep() is not None
+
+    @staticmethod
+    def hash_bytes(data: bytes) -> Optional[str]:
+        """Hash ssdeep d'un contenu en mémoire (None si ssdeep absent)"""
+        ssdeep = get_ssdeep()
+        if ssdeep is None:
+            return None
+        return ssdeep.hash(data)
+
+    @staticmethod
+    def hash_file(file_path: str) -> Optional[str]:
+        """
+        Hash ssdeep d'un fichier, mémorisé par (chemin, mtime, taille):
+        un fichier inchangé n'est lu et haché qu'une seule fois.
+        """
+        if get_ssdeep() is None:
+            return None
+        stat = os.stat(file_path)
+        return Comparator._hash_file_cached(os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _hash_file_cached(file_path: str, mtime_ns: int, size: int) -> str:
+        ssdeep = get_ssdeep()
+        try:
+            return ssdeep.hash_from_file(file_path)
+        except AttributeError:
+            # Fallback for some wrappers
+            with open(file_path, 'rb') as f:
+                return ssdeep.hash(f.read())
+
+    @staticmethod
+    def compare_hashes(hash1: str, hash2: str) -> int:
+        """Similarité ssdeep (0-100) entre deux hashs déjà calculés"""
+        ssdeep = get_ssdeep()
+        if ssdeep is None or not hash1 or not hash2:
+            return 0
+        return ssdeep.compare(hash1, hash2)
     
     @staticmethod
     def calculate_distance(file1_path: str, file2_path: str) -> Optional[int]:
@@ -17,35 +75,20 @@ class Comparator:
         Calcule la distance ssdeep entre deux fichiers
         Returns: Distance (0-100) où 100 = identiques, 0 = très différents
         """
-        if ssdeep is None:
-            print("SSDeep module not found")
+        if get_ssdeep() is None:
+            logger.warning("ssdeep module not found, distance defaults to 0")
             return 0 # Fallback
 
         try:
-            # Note: The original code used `pyssdeep`, but modern pip install is `ssdeep` or `ppdeep`.
-            # Usage might vary. Let's try standard `ssdeep` usage.
-            # If `ssdeep` library is the python wrapper for libfuzzy:
-            # hash1 = ssdeep.hash_from_file(file1_path)
-            # But the original code used `ssdeep.fuzzy_hash_filename`.
-            # I will assume the installed `ssdeep` supports `hash_from_file` or similar.
-            # Let's try to adapt to common library `ssdeep`.
-            
-            try:
-                hash1 = ssdeep.hash_from_file(file1_path)
-                hash2 = ssdeep.hash_from_file(file2_path)
-            except AttributeError:
-                 # Fallback for some wrappers
-                 with open(file1_path, 'rb') as f:
-                     hash1 = ssdeep.hash(f.read())
-                 with open(file2_path, 'rb') as f:
-                     hash2 = ssdeep.hash(f.read())
+            hash1 = Comparator.hash_file(file1_path)
+            hash2 = Comparator.hash_file(file2_path)
 
             # Validates
             if not hash1 or not hash2:
                 return 0
 
             # Compare (returns 0-100 similarity)
-            similarity = ssdeep.compare(hash1, hash2)
+            similarity = Comparator.compare_hashes(hash1, hash2)
             
             # The original code returned DISTANCE (100 - similarity)?
             # "Convertir en distance (100 - similarity)"
@@ -67,5 +110,5 @@ class Comparator:
             return 100 - similarity
             
         except Exception as e:
-            print(f"❌ Erreur comparaison ssdeep: {e}")
+            logger.exception("ssdeep comparison failed", extra={"file1": file1_path, "file2": file2_path})
             return 0
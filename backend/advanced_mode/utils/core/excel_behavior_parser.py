@@ -1,77 +1,155 @@
 
-"""Parser pour extraire signatures depuis fichier Excel"""
-import pandas as pd
-from typing import Set, Dict, List
+"""Parser pour extraire signatures depuis un rapport comportemental (Excel, CSV, JSON)"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+from importlib.util import find_spec
+from typing import TYPE_CHECKING, Callable, Iterator, Set, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd  # importé au premier rapport lu (_read_sheets), pas au démarrage
+
+# find_spec ne charge pas le module: la détection reste gratuite au démarrage
+if find_spec('python_calamine') is not None:
+    EXCEL_ENGINE = 'calamine'  # lecteur Rust, bien plus rapide qu'openpyxl
+else:
+    EXCEL_ENGINE = None  # choix par défaut de pandas (openpyxl)
+
+logger = logging.getLogger(__name__)
+
+# À incrémenter à chaque changement des règles d'extraction (invalide les caches)
+PARSER_VERSION = "2"
+
+# Colonnes reconnues dans les rapports de sandbox
+SIGNATURE_COLUMNS = ['signature', 'behavior', 'behaviour', 'action', 'event']
+RECOGNIZED_COLUMNS = frozenset(['technique_id', 'category'] + SIGNATURE_COLUMNS)
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xlsm', '.xls', '.ods')
+CSV_EXTENSIONS = ('.csv',)
+JSON_EXTENSIONS = ('.json',)
+
+
+def _normalize_column(name) -> str:
+    return str(name).strip().lower()
+
+
+def _column_filter() -> Callable[[object], bool]:
+    """
+    Construit le filtre `usecols` d'une feuille: garde les colonnes reconnues
+    et la première colonne (nécessaire pour l'auto-détection).
+    pandas évalue le filtre dans l'ordre des colonnes, un filtre par feuille.
+    """
+    seen = []
+
+    def keep(name) -> bool:
+        first = not seen
+        seen.append(name)
+        return first or _normalize_column(name) in RECOGNIZED_COLUMNS
+
+    return keep
+
+
+def _clean(series: pd.Series) -> pd.Series:
+    """Convertit en texte et retire les valeurs vides / 'nan'"""
+    values = series.dropna().astype(str).str.strip()
+    return values[(values != '') & (values != 'nan')]
+
+
+def _last_part(values: pd.Series) -> pd.Series:
+    return values.str.rsplit('-', n=1).str[-1]
+
+
+def _as_mitre(values: pd.Series) -> pd.Series:
+    """Remplace 'xxx-yyy-T1055' par 'mitre-T1055' (au moins deux tirets)"""
+    tail = _last_part(values)
+    is_mitre = (values.str.count('-') > 1) & tail.str.startswith('T')
+    return values.where(~is_mitre, 'mitre-' + tail)
+
 
 class ExcelBehaviorParser:
-    """Extrait les signatures comportementales depuis un rapport Excel"""
-    
+    """Extrait les signatures comportementales depuis un rapport Excel, CSV ou JSON"""
+
+    VERSION = PARSER_VERSION
+
     @staticmethod
-    def extract_signatures(excel_path: str) -> Set[str]:
+    def extract_signatures(report_path: str) -> Set[str]:
         signatures = set()
-        
+
         try:
-            excel_file = pd.ExcelFile(excel_path)
-            
-            for sheet_name in excel_file.sheet_names:
-                df = pd.read_excel(excel_path, sheet_name=sheet_name)
+            for sheet_name, df in ExcelBehaviorParser._read_sheets(report_path):
                 signatures.update(
                     ExcelBehaviorParser._extract_from_dataframe(df, sheet_name)
                 )
             return signatures
-            
+
         except Exception as e:
-            print(f"Error reading Excel: {e}")
+            logger.warning("error reading report: %s", e, extra={"report": report_path})
             return set()
-    
+
+    @staticmethod
+    def _read_sheets(report_path: str) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """
+        Lit le rapport une seule fois et produit (nom_feuille, DataFrame).
+        Seules les colonnes reconnues (et la première colonne) sont chargées.
+        """
+        import pandas as pd
+
+        stem, ext = os.path.splitext(os.path.basename(report_path))
+        ext = ext.lower()
+
+        if ext in CSV_EXTENSIONS:
+            yield stem, pd.read_csv(report_path, usecols=_column_filter())
+
+        elif ext in JSON_EXTENSIONS:
+            with open(report_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            # Export JSON: liste d'enregistrements, ou {feuille: [enregistrements]}
+            if isinstance(data, dict) and all(isinstance(v, list) for v in data.values()):
+                sheets = data.items()
+            else:
+                sheets = [(stem, data)]
+            for sheet_name, records in sheets:
+                df = pd.DataFrame(records)
+                keep = _column_filter()
+                yield str(sheet_name), df[[c for c in df.columns if keep(c)]]
+
+        else:
+            with pd.ExcelFile(report_path, engine=EXCEL_ENGINE) as workbook:
+                for sheet_name in workbook.sheet_names:
+                    yield sheet_name, workbook.parse(sheet_name, usecols=_column_filter())
+
     @staticmethod
     def _extract_from_dataframe(df: pd.DataFrame, sheet_name: str) -> Set[str]:
         signatures = set()
-        df.columns = df.columns.str.lower().str.strip()
-        
+        df = df.copy(deep=False)
+        df.columns = [_normalize_column(c) for c in df.columns]
+        df = df.loc[:, ~df.columns.duplicated()]
+
         # MITRE ATT&CK
         if 'technique_id' in df.columns:
-            for val in df['technique_id'].dropna():
-                sig = str(val).strip()
-                if sig and sig != 'nan':
-                    if '-' in sig:
-                        sig = sig.split('-')[-1]
-                    if sig.startswith('T'):
-                        signatures.add(f"mitre-{sig}")
-        
+            ids = _last_part(_clean(df['technique_id']))
+            signatures.update('mitre-' + ids[ids.str.startswith('T')])
+
         # Direct Columns
-        signature_cols = ['signature', 'behavior', 'behaviour', 'action', 'event']
-        for col in signature_cols:
+        for col in SIGNATURE_COLUMNS:
             if col in df.columns:
-                for val in df[col].dropna():
-                    sig = str(val).strip()
-                    if sig and sig != 'nan':
-                        if '-' in sig and sig.count('-') > 1:
-                            parts = sig.split('-')
-                            if len(parts) >= 2 and parts[-1].startswith('T'):
-                                sig = f"mitre-{parts[-1]}"
-                        signatures.add(sig)
-        
+                signatures.update(_as_mitre(_clean(df[col])))
+
         # Category + Action
         if 'category' in df.columns and 'action' in df.columns:
-            for _, row in df.iterrows():
-                cat = str(row.get('category', '')).strip()
-                act = str(row.get('action', '')).strip()
-                if cat and cat != 'nan' and act and act != 'nan':
-                    signatures.add(f"{cat}-{act}")
-        
+            pairs = df[['category', 'action']].dropna()
+            cat = pairs['category'].astype(str).str.strip()
+            act = pairs['action'].astype(str).str.strip()
+            valid = (cat != '') & (cat != 'nan') & (act != '') & (act != 'nan')
+            signatures.update(cat[valid] + '-' + act[valid])
+
         # Auto-detect first column
         if not signatures and len(df.columns) > 0:
-            first_col = df.columns[0]
-            for val in df[first_col].dropna():
-                sig = str(val).strip()
-                if sig and sig != 'nan':
-                    if '-' in sig and sig.count('-') > 1:
-                        parts = sig.split('-')
-                        if len(parts) >= 2 and parts[-1].startswith('T'):
-                            sig = f"mitre-{parts[-1]}"
-                    else:
-                        sig = f"{sheet_name}-{sig}"
-                    signatures.add(sig)
-        
+            values = _clean(df[df.columns[0]])
+            has_dashes = values.str.count('-') > 1
+            values = _as_mitre(values).where(has_dashes, f"{sheet_name}-" + values)
+            signatures.update(values)
+
         return signatures
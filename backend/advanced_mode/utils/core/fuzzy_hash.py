@@ -0,0 +1,53 @@
+
+"""Clés d'indexation n-grammes pour les hashs ssdeep"""
+import re
+from typing import Optional, Set, Tuple
+
+# ssdeep ne donne un score > 0 que si les deux signatures partagent
+# une sous-chaîne de 7 caractères (après réduction des répétitions)
+NGRAM_SIZE = 7
+
+_B64 = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+_B64_VALUES = {c: i for i, c in enumerate(_B64)}
+_REPEATS = re.compile(r"(.)\1{3,}")
+
+
+def parse_hash(fuzzy_hash: str) -> Optional[Tuple[int, str, str]]:
+    """'bs:chunk:double_chunk' -> (bs, chunk, double_chunk), None si invalide"""
+    parts = (fuzzy_hash or '').strip().split(':')
+    if len(parts) != 3 or not parts[0].isdigit():
+        return None
+    double_chunk = parts[2].split(',')[0]  # certaines versions ajoutent ',"nom"'
+    return int(parts[0]), parts[1], double_chunk
+
+
+def _normalize(chunk: str) -> str:
+    """Comme ssdeep: les séquences de plus de 3 caractères identiques sont réduites à 3"""
+    return _REPEATS.sub(lambda m: m.group(1) * 3, chunk)
+
+
+def ngrams(chunk: str) -> Set[int]:
+    """Les n-grammes de 7 caractères, encodés sur 42 bits"""
+    chunk = _normalize(chunk)
+    grams = set()
+    for i in range(len(chunk) - NGRAM_SIZE + 1):
+        value = 0
+        for c in chunk[i:i + NGRAM_SIZE]:
+            value = (value << 6) | _B64_VALUES.get(c, 0)
+        grams.add(value)
+    return grams
+
+
+def index_keys(fuzzy_hash: str) -> Set[Tuple[int, int]]:
+    """
+    Clés (taille_de_bloc, n-gramme) d'un hash. Le bloc simple est indexé
+    sous bs et le bloc double sous 2*bs: deux hashs comparables par ssdeep
+    (tailles bs/2, bs ou 2*bs) partagent alors au moins une clé.
+    """
+    parsed = parse_hash(fuzzy_hash)
+    if parsed is None:
+        return set()
+    block_size, chunk, double_chunk = parsed
+    keys = {(block_size, g) for g in ngrams(chunk)}
+    keys.update((block_size * 2, g) for g in ngrams(double_chunk))
+    return keys
@@ -0,0 +1,73 @@
+
+"""Similarité de Jaccard par lots sur des ensembles de signatures encodés en bitsets"""
+import numpy as np
+from typing import Iterator, Sequence, Tuple
+
+# Mémoire temporaire max. par bloc de lignes lors du calcul de la matrice
+BLOCK_BYTES = 32 * 1024 * 1024
+
+_POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def _popcount(words: np.ndarray) -> np.ndarray:
+    """Nombre de bits à 1 par mot uint64"""
+    if hasattr(np, 'bitwise_count'):  # NumPy >= 2.0
+        return np.bitwise_count(words)
+    as_bytes = words.view(np.uint8).reshape(words.shape + (8,))
+    return _POPCOUNT_TABLE[as_bytes].sum(axis=-1, dtype=np.uint8)
+
+
+def pack_bitsets(id_arrays: Sequence[np.ndarray]) -> np.ndarray:
+    """
+    Encode chaque ensemble d'ids en bitset (une ligne de mots uint64).
+    Le vocabulaire est d'abord réduit aux ids présents dans le lot,
+    ce qui garde les bitsets compacts même si le vocabulaire global est grand.
+
+    Returns:
+        Matrice (N, W) de uint64
+    """
+    n = len(id_arrays)
+    if n == 0:
+        return np.zeros((0, 0), dtype=np.uint64)
+
+    lengths = np.array([len(ids) for ids in id_arrays], dtype=np.int64)
+    all_ids = np.concatenate([np.asarray(ids, dtype=np.int64) for ids in id_arrays]) \
+        if lengths.sum() else np.zeros(0, dtype=np.int64)
+    vocabulary, columns = np.unique(all_ids, return_inverse=True)
+
+    words = max(1, (len(vocabulary) + 63) // 64)
+    bits = np.zeros((n, words * 64), dtype=bool)
+    rows = np.repeat(np.arange(n), lengths)
+    bits[rows, columns] = True
+
+    packed = np.packbits(bits, axis=1, bitorder='little')
+    return packed.view('<u8').astype(np.uint64, copy=False)
+
+
+def jaccard_blocks(bitsets: np.ndarray) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Lignes de la matrice de Jaccard par blocs : (première ligne, bloc (B, N)).
+    Seul un bloc de BLOCK_BYTES environ est en mémoire à la fois, ce qui
+    permet de parcourir la matrice de grandes cohortes sans la construire.
+    """
+    n, words = bitsets.shape
+    counts = _popcount(bitsets).sum(axis=1, dtype=np.int64)
+    block = max(1, BLOCK_BYTES // max(1, n * words * 8))
+    for start in range(0, n, block):
+        stop = min(n, start + block)
+        common = _popcount(bitsets[start:stop, None, :] & bitsets[None, :, :]).sum(axis=2, dtype=np.int64)
+        union = counts[start:stop, None] + counts[None, :] - common
+        with np.errstate(divide='ignore', invalid='ignore'):
+            yield start, np.where(union > 0, common / union, 0.0).astype(np.float32)
+
+
+def jaccard_matrix(bitsets: np.ndarray) -> np.ndarray:
+    """
+    Matrice (N, N) de similarité de Jaccard |A ∩ B| / |A ∪ B|.
+    Deux ensembles vides ont une similarité de 0 (comme l'analyse unitaire).
+    """
+    n = bitsets.shape[0]
+    result = np.empty((n, n), dtype=np.float32)
+    for start, rows in jaccard_blocks(bitsets):
+        result[start:start + len(rows)] = rows
+    return result
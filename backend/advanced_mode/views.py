@@ -1,42 +1,71 @@
 
 from rest_framework.views import APIView
+from rest_framework import generics
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework import status
 import os
-import json
 import hashlib
-from django.conf import settings
+import json
+import time
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from django.core.files.base import ContentFile
 from .utils.perturbations.registry import PerturbationRegistry
-from .utils.core.scorer import Scorer
 from .utils.core.comparator import Comparator
 from .utils.core.excel_behavior_parser import ExcelBehaviorParser
+from .signature_cache import get_signature_cache
+from .models import BehaviorReport, AnalysisJob
+from .reports import register_report, load_id_arrays
+from .analysis import analyze_reports
+from .jobs import submit as submit_job
+from .signature_index import reports_matching, cooccurring_signatures
+from .serializers import BehaviorReportSerializer, AnalysisJobSerializer
+from .fuzzy_index import similar_files
+from files.models import File
+from files.downloads import file_response
+from files.storage import blob_name, blob_storage, blob_sha256
+from users.models import UserFile
+from backend.metrics import observe_stage, timed
 
 # Helpers to match 'models/malware.py' and 'models/variant.py' logic
+@timed("hashing")
 def calculate_md5(path):
+    digest = hashlib.md5()
     with open(path, 'rb') as f:
-        return hashlib.md5(f.read()).hexdigest()
-
-def calculate_size(path):
-    return os.path.getsize(path)
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
 
-def load_config():
-    config_path = os.path.join(os.path.dirname(__file__), 'utils', 'config.json')
-    try:
-        with open(config_path, 'r') as f:
-            return json.load(f)
-    except:
-        return {"scorings": {"weight_vt": 0.7, "weight_ssdeep": 0.3}}
+def calculate_upload_sha256(file_obj):
+    # Computed while the upload was received (files.uploadhandler)
+    if getattr(file_obj, 'sha256', None):
+        return file_obj.sha256
+    with timed("hashing"):
+        digest = hashlib.sha256()
+        for chunk in file_obj.chunks():
+            digest.update(chunk)
+        return digest.hexdigest()
 
 def save_uploaded_file(file_obj, subfolder):
-    path = os.path.join(settings.MEDIA_ROOT, 'advanced', subfolder)
-    os.makedirs(path, exist_ok=True)
-    full_path = os.path.join(path, file_obj.name)
-    with open(full_path, 'wb+') as destination:
-        for chunk in file_obj.chunks():
-            destination.write(chunk)
-    return full_path
+    # One blob per content (files.storage), exposed under advanced/<subfolder>/<sha256>/<name>:
+    # duplicates are not copied again and same-name uploads no longer overwrite each other
+    blob = blob_storage.save(file_obj.name, file_obj)
+    return blob_storage.link(blob, os.path.join('advanced', subfolder, blob_sha256(blob), file_obj.name))
+
+def parse_report(file_obj):
+    """Returns (content_hash, signatures); reports already parsed come from the cache"""
+    content_hash = calculate_upload_sha256(file_obj)
+    # Stored even on a cache hit: BehaviorReport is served from this blob (ReportDownloadView)
+    path = save_uploaded_file(file_obj, 'reports')
+
+    def parse():
+        with timed("report_parsing"):
+            return ExcelBehaviorParser().extract_signatures(path)
+
+    return content_hash, get_signature_cache().get_or_parse(content_hash, parse)
 
 class ExperimentStartView(APIView):
     permission_classes = [IsAuthenticated]
@@ -49,9 +78,10 @@ class ExperimentStartView(APIView):
 
         file_path = save_uploaded_file(file_obj, 'original')
         
-        # Feature Parity: Calculate MD5 & Size immediately (Like Malware model)
-        md5_hash = calculate_md5(file_path)
-        size_bytes = calculate_size(file_path)
+        # Feature Parity: MD5 & Size (Like Malware model), computed during the upload
+        md5_hash = getattr(file_obj, 'md5', None) or calculate_md5(file_path)
+        size_bytes = file_obj.size
+        fuzzy_hash = getattr(file_obj, 'ssdeep', None) or Comparator.hash_file(file_path)
 
         is_exe = file_obj.name.lower().endswith('.exe')
         
@@ -67,6 +97,7 @@ class ExperimentStartView(APIView):
             "original_file_path": file_path,
             "md5": md5_hash,
             "size": size_bytes,
+            "ssdeep": fuzzy_hash,
             "recommendation": recommendation,
             "available_perturbations": available_perturbations
         })
@@ -86,16 +117,16 @@ class ExperimentMutateView(APIView):
                 original_bytes = f.read()
             
             registry = PerturbationRegistry()
-            modified_bytes = registry.apply(perturbation_name, original_bytes)
+            with timed("perturbation"):
+                modified_bytes = registry.apply(perturbation_name, original_bytes)
             
             # Save Variant
             filename = os.path.basename(original_path)
             variant_filename = f"{filename}.{perturbation_name}.exe"
-            variant_path = os.path.join(settings.MEDIA_ROOT, 'advanced', 'variants', variant_filename)
-            os.makedirs(os.path.dirname(variant_path), exist_ok=True)
-            
-            with open(variant_path, 'wb') as f:
-                f.write(modified_bytes)
+            variant_blob = blob_storage.save(variant_filename, ContentFile(modified_bytes))
+            variant_path = blob_storage.link(
+                variant_blob, os.path.join('advanced', 'variants', blob_sha256(variant_blob), variant_filename)
+            )
             
             # Feature Parity: Check PE Validity (Step 6 of manual pipeline)
             # We use lief to check if it parses correctly
@@ -112,19 +143,22 @@ class ExperimentMutateView(APIView):
             except Exception:
                 is_valid = False
 
-            # Calculate MD5/Size (Like Variant model)
-            variant_md5 = calculate_md5(variant_path)
-            variant_size = calculate_size(variant_path)
+            # Calculate MD5/Size (Like Variant model) from the bytes we just wrote
+            with timed("hashing"):
+                variant_md5 = hashlib.md5(modified_bytes).hexdigest()
+                variant_ssdeep = Comparator.hash_bytes(modified_bytes)
+            variant_size = len(modified_bytes)
                 
-            relative_url = os.path.relpath(variant_path, settings.MEDIA_ROOT).replace('\\', '/')
-            download_url = f"{settings.MEDIA_URL}{relative_url}"
-            
+            # Owned row: served by VariantDownloadView, and holds a reference to the blob
+            variant = File.objects.create(owner=request.user, name=variant_filename[:255], file=variant_blob)
+
             return Response({
                 "status": "success",
-                "variant_url": download_url,
+                "variant_url": reverse('variant_download', args=[variant.pk]),
                 "variant_path": variant_path,
                 "variant_md5": variant_md5,
                 "variant_size": variant_size,
+                "variant_ssdeep": variant_ssdeep,
                 "is_valid": is_valid
             })
             
@@ -146,40 +180,273 @@ class ExperimentAnalyzeView(APIView):
         if not excel_original or not excel_variant:
              return Response({"error": "Both Excel reports are required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        path_orig_xls = save_uploaded_file(excel_original, 'reports')
-        path_var_xls = save_uploaded_file(excel_variant, 'reports')
-        
-        parser = ExcelBehaviorParser()
-        sigs_original = parser.extract_signatures(path_orig_xls)
-        sigs_variant = parser.extract_signatures(path_var_xls)
-        
-        common = sigs_original.intersection(sigs_variant)
-        total = sigs_original.union(sigs_variant)
-        similarity = len(common) / len(total) if len(total) > 0 else 0
-        is_functional = similarity >= 0.6
-        
-        ssdeep_dist = 0
-        if original_file_path and variant_file_path:
-            # Feature: Calculate explicit SSDeep distance
-            comparator = Comparator()
-            ssdeep_dist = comparator.calculate_distance(original_file_path, variant_file_path)
-        
-        # Load Config for weights
-        config = load_config()
-        weights = config.get("scorings", {"weight_vt": 0.7, "weight_ssdeep": 0.3})
-        
-        scorer = Scorer(weight_vt=weights["weight_vt"], weight_ssdeep=weights["weight_ssdeep"])
-        score_details = scorer.calculate_detailed_score(
-            original_vt_rate=rate_original / 100.0,
-            variant_vt_rate=rate_variant / 100.0,
-            ssdeep_distance=ssdeep_dist,
-            is_functional=is_functional
+        hash_original, sigs_original = parse_report(excel_original)
+        hash_variant, sigs_variant = parse_report(excel_variant)
+
+        result = analyze_reports(
+            request.user,
+            (excel_original.name, hash_original, sigs_original),
+            (excel_variant.name, hash_variant, sigs_variant),
+            rate_original,
+            rate_variant,
+            original_file_path,
+            variant_file_path,
         )
-        
+        return Response({"status": "success", **result})
+
+class AnalysisJobSubmitView(APIView):
+    """
+    Same input as ExperimentAnalyzeView, but the analysis runs on the
+    background worker pool (jobs.py): answers 202 with the job id to poll.
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = (MultiPartParser, FormParser)
+
+    def post(self, request):
+        excel_original = request.FILES.get('excel_original')
+        excel_variant = request.FILES.get('excel_variant')
+        if not excel_original or not excel_variant:
+             return Response({"error": "Both Excel reports are required"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            rate_original = float(request.data.get('rate_original', 0))
+            rate_variant = float(request.data.get('rate_variant', 0))
+        except (TypeError, ValueError):
+            return Response({"error": "rate_original and rate_variant must be numbers"}, status=status.HTTP_400_BAD_REQUEST)
+
+        # The worker parses from disk: store both reports now
+        params = {
+            "rate_original": rate_original,
+            "rate_variant": rate_variant,
+            "original_file_path": request.data.get('original_file_path'),
+            "variant_file_path": request.data.get('variant_file_path'),
+        }
+        for key, report in (("original", excel_original), ("variant", excel_variant)):
+            params[key] = {
+                "name": report.name,
+                "content_hash": calculate_upload_sha256(report),
+                "path": save_uploaded_file(report, 'reports'),
+            }
+
+        job = AnalysisJob.objects.create(owner=request.user, params=params)
+        submit_job(job)
+        job.refresh_from_db()
+        return Response(AnalysisJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+class AnalysisJobDetailView(APIView):
+    """Status of a job, with the stored analysis once it is done"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        job = AnalysisJob.objects.filter(pk=job_id, owner=request.user).defer('params').first()
+        if job is None:
+            return Response({"error": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(AnalysisJobSerializer(job).data)
+
+class ReportDownloadView(APIView):
+    """Downloads one of the user's stored reports (Range / If-None-Match: files.downloads)"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        report = BehaviorReport.objects.filter(pk=pk, owner=request.user).only('name', 'content_hash').first()
+        if report is None:
+            return Response({"error": "Report not found"}, status=status.HTTP_404_NOT_FOUND)
+        # The content hash is the SHA-256 the report was stored under (parse_report), and
+        # the report holds a reference to that blob (files.signals)
+        return file_response(request, blob_name(report.content_hash), report.name, report.content_hash)
+
+class VariantDownloadView(APIView):
+    """Downloads a variant generated by ExperimentMutateView for the user"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        variant = File.objects.filter(pk=pk, owner=request.user).only('name', 'file', 'sha256').first()
+        if variant is None:
+            return Response({"error": "Variant not found"}, status=status.HTTP_404_NOT_FOUND)
+        return file_response(request, variant.file.name, variant.name, variant.sha256)
+
+class ReportListView(APIView):
+    """Lists the user's stored behavior reports, or stores new ones (field 'reports')"""
+    permission_classes = [IsAuthenticated]
+    parser_classes = (MultiPartParser, FormParser)
+
+    def get(self, request):
+        reports = BehaviorReport.objects.filter(owner=request.user).order_by('-created_at')
+        return Response([
+            {
+                "id": r.id,
+                "name": r.name,
+                "signature_count": r.signature_count,
+                "created_at": r.created_at.strftime("%Y-%m-%d %H:%M"),
+            }
+            for r in reports.only('id', 'name', 'signature_count', 'created_at')
+        ])
+
+    def post(self, request):
+        files = request.FILES.getlist('reports')
+        if not files:
+            return Response({"error": "No report provided"}, status=status.HTTP_400_BAD_REQUEST)
+
+        parsed = []
+        for file_obj in files:
+            content_hash, signatures = parse_report(file_obj)
+            # Nothing extracted: unreadable or unsupported report, don't store it
+            if not signatures:
+                return Response({"error": f"No signatures found in {file_obj.name}"}, status=status.HTTP_400_BAD_REQUEST)
+            parsed.append((file_obj.name, content_hash, signatures))
+
+        created = []
+        for name, content_hash, signatures in parsed:
+            report = register_report(request.user, name, content_hash, signatures)
+            created.append({"id": report.id, "name": report.name, "signature_count": report.signature_count})
+        return Response(created, status=status.HTTP_201_CREATED)
+
+class ReportSimilarityView(APIView):
+    """
+    Pairwise Jaccard similarity for a cohort of stored reports, as the
+    condensed upper triangle: row i holds the similarity of report i with
+    reports i+1..N-1 (the matrix is symmetric with ones on the diagonal).
+    Rows are computed by blocks and streamed, so the N^2 matrix is never
+    held in memory or serialized at once.
+    """
+    permission_classes = [IsAuthenticated]
+    # N(N-1)/2 values in the response: 4 MB of JSON at 1000 reports, 100 MB at 5000
+    max_reports = 5000
+
+    def post(self, request):
+        report_ids = request.data.get('report_ids')
+        if not isinstance(report_ids, list) or not report_ids:
+            return Response({"error": "report_ids must be a non-empty list"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(report_ids) > self.max_reports:
+            return Response({"error": f"At most {self.max_reports} reports per request"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            report_ids = list(dict.fromkeys(int(i) for i in report_ids))
+        except (TypeError, ValueError):
+            return Response({"error": "report_ids must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+
+        start = time.perf_counter()
+        reports = BehaviorReport.objects.filter(id__in=report_ids)
+        if not request.user.is_staff:
+            reports = reports.filter(owner=request.user)
+        by_id = {r.id: r for r in reports.only('id', 'signature_ids')}
+        missing = [i for i in report_ids if i not in by_id]
+        if missing:
+            return Response({"error": "Reports not found", "missing": missing}, status=status.HTTP_404_NOT_FOUND)
+        loaded = time.perf_counter()
+
+        from .utils.core.similarity import pack_bitsets  # numpy, loaded on first use
+
+        bitsets = pack_bitsets(load_id_arrays([by_id[i] for i in report_ids]))
+        return StreamingHttpResponse(
+            self.stream(report_ids, bitsets, load_ms=(loaded - start) * 1000), content_type='application/json',
+        )
+
+    @staticmethod
+    def stream(report_ids, bitsets, load_ms):
+        from .utils.core.similarity import jaccard_blocks
+
+        yield '{"report_ids": %s, "similarities": [' % json.dumps(report_ids)
+        compute = 0.0
+        blocks = jaccard_blocks(bitsets)
+        while True:
+            started = time.perf_counter()
+            block = next(blocks, None)
+            compute += time.perf_counter() - started
+            if block is None:
+                break
+            first, rows = block
+            yield (',' if first else '') + ','.join(
+                json.dumps(row[first + i + 1:].astype(float).round(4).tolist()) for i, row in enumerate(rows)
+            )
+        observe_stage("report_similarity", compute)
+        yield '], "stats": %s}' % json.dumps({
+            "reports": len(report_ids),
+            "pairs": len(report_ids) * (len(report_ids) - 1) // 2,
+            "bitset_bits": int(bitsets.shape[1] * 64),
+            "bitset_bytes": int(bitsets.nbytes),
+            "load_ms": load_ms,
+            "compute_ms": compute * 1000,
+        })
+
+class SignatureIndexPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+def visible_reports(user):
+    """Staff can query every stored report, other users only their own"""
+    reports = BehaviorReport.objects.all()
+    return reports if user.is_staff else reports.filter(owner=user)
+
+class ReportSearchView(generics.ListAPIView):
+    """
+    Reports containing the given signatures, from the inverted index.
+    Query: ?signature=mitre-T1055&signature=...&match=all|any
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = BehaviorReportSerializer
+    pagination_class = SignatureIndexPagination
+
+    def list(self, request, *args, **kwargs):
+        if not request.query_params.getlist('signature'):
+            return Response({"error": "At least one 'signature' parameter is required"}, status=status.HTTP_400_BAD_REQUEST)
+        if request.query_params.get('match', 'all') not in ('all', 'any'):
+            return Response({"error": "match must be 'all' or 'any'"}, status=status.HTTP_400_BAD_REQUEST)
+        return super().list(request, *args, **kwargs)
+
+    def get_queryset(self):
+        params = self.request.query_params
+        return reports_matching(
+            visible_reports(self.request.user),
+            params.getlist('signature'),
+            match=params.get('match', 'all'),
+        ).only('id', 'name', 'signature_count', 'created_at').order_by('-id')
+
+class CooccurringSignaturesView(generics.GenericAPIView):
+    """
+    Signatures most often found together with the given ones.
+    Query: ?signature=mitre-T1055&signature=...
+    """
+    permission_classes = [IsAuthenticated]
+    pagination_class = SignatureIndexPagination
+
+    def get(self, request):
+        names = request.query_params.getlist('signature')
+        if not names:
+            return Response({"error": "At least one 'signature' parameter is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = cooccurring_signatures(visible_reports(request.user), names)
+        page = self.paginate_queryset(rows)
+        return self.get_paginated_response(list(page))
+
+class SimilarFilesView(APIView):
+    """
+    Top-k stored files most similar (ssdeep) to a file or a hash.
+    Query: ?hash=<ssdeep> | ?user_file=<id> | ?file=<id>, and &k=10
+    """
+    permission_classes = [IsAuthenticated]
+    max_k = 100
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            k = min(max(int(params.get('k', 10)), 1), self.max_k)
+        except ValueError:
+            return Response({"error": "k must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        exclude = None
+        fuzzy_hash = params.get('hash')
+        for kind, model, owner_field in (('user_file', UserFile, 'user'), ('file', File, 'owner')):
+            if params.get(kind):
+                stored = model.objects.filter(pk=params[kind]).first() if params[kind].isdigit() else None
+                if stored is None or (not request.user.is_staff and getattr(stored, f"{owner_field}_id") != request.user.id):
+                    return Response({"error": "File not found"}, status=status.HTTP_404_NOT_FOUND)
+                fuzzy_hash, exclude = stored.ssdeep, (kind, stored.id)
+                break
+
+        if not fuzzy_hash:
+            return Response({"error": "Provide hash, user_file or file (with a computed ssdeep hash)"}, status=status.HTTP_400_BAD_REQUEST)
+
         return Response({
-            "status": "success",
-            "scores": score_details,
-            "similarity_percent": similarity * 100,
-            "signatures_original": list(sigs_original),
-            "signatures_variant": list(sigs_variant)
+            "ssdeep": fuzzy_hash,
+            "results": similar_files(fuzzy_hash, user=request.user, k=k, exclude=exclude),
         })
@@ -0,0 +1,36 @@
+"""Structured log lines: `time level logger message key=value ...`"""
+import logging
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+
+def _quote(value) -> str:
+    text = str(value)
+    if not text or any(c in text for c in ' "='):
+        return '"' + text.replace('\\', '\\\\').replace('"', '\\"') + '"'
+    return text
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Appends the `extra` fields of a record as key=value pairs, so log lines
+    stay greppable and can be parsed by log collectors:
+
+        logger.info("report parsed", extra={"signatures": 42, "duration_ms": 12.5})
+    """
+
+    def __init__(self, fmt="%(asctime)s %(levelname)s %(name)s %(message)s", datefmt=None):
+        super().__init__(fmt, datefmt)
+
+    def format(self, record):
+        line = super().format(record)
+        # Scalars only: Django passes objects (e.g. the request) that don't belong on one line
+        fields = [
+            f"{key}={_quote(value)}" for key, value in vars(record).items()
+            if key not in _RESERVED and isinstance(value, (str, int, float, bool))
+        ]
+        if fields:
+            head, sep, trace = line.partition("\n")
+            line = head + " " + " ".join(fields) + sep + trace
+        return line
@@ -0,0 +1,75 @@
+import cProfile
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.utils import timezone
+
+from .metrics import PROFILES, REQUESTS, REQUEST_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+def _view_label(request) -> str:
+    # Route names, not paths: metric labels must stay a small, fixed set
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return "unmatched"
+    return match.view_name or match._func_path
+
+
+class RequestMetricsMiddleware:
+    """
+    Records the latency and status of every request (backend.metrics) and
+    logs slow ones. With settings.PROFILING['MODE'] set to 'all', or to
+    'header' and an `X-Profile: 1` request header, the request runs under
+    cProfile; the profile is written to PROFILING['DIRECTORY'] when the
+    request took at least PROFILING['SLOW_REQUEST_SECONDS'].
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        options = getattr(settings, 'PROFILING', {})
+        self.mode = options.get('MODE', 'off')
+        self.slow_seconds = options.get('SLOW_REQUEST_SECONDS', 1.0)
+        self.directory = str(options.get('DIRECTORY', settings.BASE_DIR / 'profiles'))
+
+    def __call__(self, request):
+        profiler = cProfile.Profile() if self._should_profile(request) else None
+        start = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+        elapsed = time.perf_counter() - start
+
+        view = _view_label(request)
+        labels = {"method": request.method, "view": view, "status": response.status_code}
+        REQUEST_SECONDS.observe(elapsed, **labels)
+        REQUESTS.inc(**labels)
+
+        if elapsed >= self.slow_seconds:
+            logger.warning("slow request", extra={
+                "method": request.method, "path": request.path, "view": view,
+                "status": response.status_code, "duration_ms": round(elapsed * 1000, 1),
+            })
+            if profiler is not None:
+                self._dump(profiler, view)
+        return response
+
+    def _should_profile(self, request) -> bool:
+        if self.mode == 'all':
+            return True
+        return self.mode == 'header' and request.headers.get('X-Profile') == '1'
+
+    def _dump(self, profiler, view):
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"{timezone.now():%Y%m%dT%H%M%S%f}-{view.replace(':', '_').replace('.', '_')}.prof"
+        path = os.path.join(self.directory, name)
+        profiler.dump_stats(path)
+        PROFILES.inc(view=view)
+        logger.info("request profile written", extra={"view": view, "profile": path})
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -48,6 +49,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'backend.middleware.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -81,10 +83,26 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite profile, chosen with the SHAPESHIFTER_SQLITE_PROFILE environment variable.
+# 'wal' is the one to deploy with concurrent requests or job workers: readers
+# no longer wait for writers (write-ahead log), a writer waits up to `timeout`
+# seconds for the lock (busy timeout) instead of failing with "database is
+# locked", and transactions take the write lock when they begin (IMMEDIATE),
+# so two of them can't deadlock upgrading a read lock.
+SQLITE_PROFILES = {
+    'default': {},
+    'wal': {
+        'timeout': 20,
+        'transaction_mode': 'IMMEDIATE',
+        'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL',
+    },
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': SQLITE_PROFILES[os.environ.get('SHAPESHIFTER_SQLITE_PROFILE', 'default')],
     }
 }
 
@@ -136,10 +154,81 @@ CORS_ALLOWED_ORIGINS = [
 ]
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'users.authentication.CachedTokenAuthentication',
     ]
 }
 
+# Token -> user lookups cached between requests (users/authentication.py).
+# Logout, token rotation and user changes invalidate entries in this process
+# (and in SHARED_CACHE); other processes' in-memory entries live up to TTL.
+TOKEN_AUTH_CACHE = {
+    'TTL': 60,                 # seconds
+    'MAX_ENTRIES': 10000,
+    'SHARED_CACHE': None,      # optional alias from CACHES, shared between workers
+}
+
 # Media files (for user uploads)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+
+# File downloads (files.downloads): 'stream' reads files in CHUNK_SIZE pieces
+# in the worker; 'x-sendfile' (Apache mod_xsendfile, lighttpd) and
+# 'x-accel-redirect' (nginx, `internal` location aliasing MEDIA_ROOT at
+# ACCEL_REDIRECT_LOCATION) hand the transfer to the front server.
+FILE_DOWNLOADS = {
+    'MODE': 'stream',
+    'ACCEL_REDIRECT_LOCATION': '/protected-media/',
+    'CHUNK_SIZE': 64 * 1024,
+}
+
+# Parsed behavior signatures cache (advanced_mode.signature_cache)
+SIGNATURE_CACHE = {
+    'MEMORY_ENTRIES': 256,            # in-process LRU tier
+    'MAX_BYTES': 64 * 1024 * 1024,    # database tier, evicted least recently used first
+}
+
+# Uploads are streamed to disk and hashed on the fly (files.uploadhandler).
+# The temporary directory lives under MEDIA_ROOT so storing an upload is a rename.
+FILE_UPLOAD_HANDLERS = ['files.uploadhandler.HashingFileUploadHandler']
+FILE_UPLOAD_TEMP_DIR = str(MEDIA_ROOT / 'tmp')
+
+# Keyset pagination cursor of users.views.admin_files, readable by the frontend
+CORS_EXPOSE_HEADERS = ['X-Next-Cursor']
+
+# Background report analysis (advanced_mode.jobs): jobs are stored in the
+# database and run on a local pool, no broker needed. WORKERS caps concurrent
+# jobs; EXECUTOR is 'process' (parse reports in worker processes), 'thread'
+# or 'inline' (run at submission).
+ANALYSIS_JOBS = {
+    'WORKERS': 2,             # concurrent jobs per server process
+    'PARSER_PROCESSES': 2,    # pandas parsing processes
+    'EXECUTOR': 'process',
+}
+
+# Structured logs (backend.log): `time level logger message key=value ...`
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'structured': {'()': 'backend.log.StructuredFormatter'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'structured'},
+    },
+    'root': {'handlers': ['console'], 'level': 'WARNING'},
+    'loggers': {
+        name: {'handlers': ['console'], 'level': 'INFO', 'propagate': False}
+        for name in ('backend', 'users', 'files', 'evasion', 'advanced_mode')
+    },
+}
+
+# Prometheus scrape endpoint (/metrics, backend.metrics)
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+
+# cProfile of slow requests (backend.middleware.RequestMetricsMiddleware).
+# MODE: 'off', 'header' (requests sent with `X-Profile: 1`) or 'all'
+PROFILING = {
+    'MODE': 'off',
+    'SLOW_REQUEST_SECONDS': 1.0,
+    'DIRECTORY': BASE_DIR / 'profiles',
+}
@@ -1,14 +1,14 @@
 from django.contrib import admin
 from django.urls import path, include
-from django.conf import settings
-from django.conf.urls.static import static
+from .views import metrics
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/users/', include('users.urls')),  # point to our new users app
     path('api/evasion/', include('evasion.urls')),
     path('api/advanced/', include('advanced_mode.urls')),
+    path('metrics', metrics, name='metrics'),
 ]
 
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# MEDIA_ROOT is never served as is: stored files go through the download
+# views (users.views.download_file, advanced_mode.views), which check the owner
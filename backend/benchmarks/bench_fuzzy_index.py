@@ -0,0 +1,80 @@
+
+"""
+Benchmark: recherche top-k dans l'index n-grammes des hashs ssdeep
+(FuzzyHash / FuzzyHashGram) sur une collection de hashs synthétiques.
+
+Usage:
+    python benchmarks/bench_fuzzy_index.py [--hashes 100000] [--queries 50]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import django_env
+
+B64 = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+
+
+def mutate(chunk, rng, edits):
+    chars = list(chunk)
+    for _ in range(edits):
+        chars[rng.randrange(len(chars))] = rng.choice(B64)
+    return ''.join(chars)
+
+
+def make_hashes(count, family_size=20, seed=0):
+    """Familles de hashs proches (mêmes blocs, quelques caractères modifiés)"""
+    rng = random.Random(seed)
+    hashes = []
+    while len(hashes) < count:
+        block_size = 3 * 2 ** rng.randrange(4, 14)
+        chunk = ''.join(rng.choice(B64) for _ in range(64))
+        double_chunk = ''.join(rng.choice(B64) for _ in range(32))
+        for _ in range(family_size):
+            hashes.append(f"{block_size}:{mutate(chunk, rng, 6)}:{mutate(double_chunk, rng, 3)}")
+    return list(dict.fromkeys(hashes[:count]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--hashes', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--k', type=int, default=10)
+    args = parser.parse_args()
+
+    django_env.setup()
+    from django.db import transaction
+    from advanced_mode.fuzzy_index import index_hash, similar_hashes
+    from advanced_mode.models import FuzzyHashGram
+
+    hashes = make_hashes(args.hashes)
+    start = time.perf_counter()
+    with transaction.atomic():
+        for h in hashes:
+            index_hash(h)
+    print(f"Indexed {len(hashes)} hashes / {FuzzyHashGram.objects.count()} n-gram keys "
+          f"in {time.perf_counter() - start:.1f} s")
+
+    rng = random.Random(1)
+    queries = []
+    for h in rng.sample(hashes, args.queries):
+        block_size, chunk, double_chunk = h.split(':')
+        queries.append(f"{block_size}:{mutate(chunk, rng, 2)}:{double_chunk}")
+    timings, found = [], 0
+    for q in queries:
+        start = time.perf_counter()
+        results = similar_hashes(q, k=args.k)
+        timings.append(time.perf_counter() - start)
+        found += bool(results)
+
+    timings.sort()
+    print(f"Top-{args.k} query: p50 {timings[len(timings) // 2] * 1000:.1f} ms, "
+          f"max {timings[-1] * 1000:.1f} ms, {found}/{len(queries)} queries with matches")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Micro-benchmarks: ExcelBehaviorParser (xlsx, csv, json), Comparator (ssdeep)
+requêtes du tableau de bord (recent_uploads, storage_usage, get_stats,
+admin_files) et endpoint de similarité des rapports, sur une base SQLite
+jetable. Les résultats sont ajoutés à un
+fichier JSON Lines (voir results.py / compare_results.py).
+
+Usage:
+    python benchmarks/bench_micro.py [--rows 5000] [--sheets 6] [--repeat 5]
+        [--users 10] [--files-per-user 1000] [--reports 1000]
+        [--only parser comparator dashboard similarity]
+        [--output benchmarks/results/results.jsonl]
+"""
+import os
+import sys
+import random
+import tempfile
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import django_env
+from report_generator import FORMATS, write_report
+from results import DEFAULT_OUTPUT, measure, print_table, summarize, write_results
+
+SUITES = ('parser', 'comparator', 'dashboard', 'similarity')
+
+
+def bench_parser(workdir, args):
+    from advanced_mode.utils.core.excel_behavior_parser import ExcelBehaviorParser, EXCEL_ENGINE
+
+    results = {}
+    for fmt in FORMATS:
+        path = write_report(os.path.join(workdir, f"report.{fmt}"), fmt, args.rows, args.sheets)
+        samples, signatures = measure(lambda: ExcelBehaviorParser.extract_signatures(path), args.repeat)
+        results[f"parser.{fmt}"] = dict(
+            summarize(samples), signatures=len(signatures), bytes=os.path.getsize(path),
+            engine=EXCEL_ENGINE if fmt == 'xlsx' else None,
+        )
+    return results
+
+
+def bench_comparator(workdir, args):
+    from advanced_mode.utils.core.comparator import Comparator
+
+    if not Comparator.available():
+        print("ssdeep is not installed: Comparator benchmarks skipped")
+        return {}
+
+    data = random.Random(0).randbytes(args.sample_bytes)
+    variant = data[:len(data) // 2] + b'\x90' * 4096 + data[len(data) // 2:]
+    paths = []
+    for name, content in (('sample.bin', data), ('variant.bin', variant)):
+        paths.append(os.path.join(workdir, name))
+        with open(paths[-1], 'wb') as f:
+            f.write(content)
+    hash1, hash2 = Comparator.hash_bytes(data), Comparator.hash_bytes(variant)
+
+    def hash_file_uncached():
+        Comparator._hash_file_cached.cache_clear()
+        return Comparator.hash_file(paths[0])
+
+    results = {}
+    for name, func in (
+        ('comparator.hash_bytes', lambda: Comparator.hash_bytes(data)),
+        ('comparator.hash_file', hash_file_uncached),
+        ('comparator.hash_file_cached', lambda: Comparator.hash_file(paths[0])),
+        ('comparator.compare_hashes', lambda: Comparator.compare_hashes(hash1, hash2)),
+        ('comparator.calculate_distance', lambda: Comparator.calculate_distance(*paths)),
+    ):
+        samples, _ = measure(func, args.repeat)
+        results[name] = summarize(samples)
+    results['comparator.hash_bytes']['bytes'] = len(data)
+    return results
+
+
+def bench_dashboard(workdir, args):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.test import APIRequestFactory, force_authenticate
+    from users import views
+
+    accounts = django_env.seed_files(args.users, args.files_per_user)
+    staff, user = accounts[0], accounts[-1]
+    factory = APIRequestFactory()
+
+    def call(view, user, path, **params):
+        request = factory.get(path, params)
+        force_authenticate(request, user=user)
+        return view(request)
+
+    # Cursor of a page deep in the listing, to check keyset pagination stays flat
+    cursor = None
+    for _ in range(10):
+        next_cursor = call(views.admin_files, staff, '/', limit=100, **({'cursor': cursor} if cursor else {})).get('X-Next-Cursor')
+        if next_cursor is None:
+            break  # Last page
+        cursor = next_cursor
+
+    results = {}
+    for name, func in (
+        ('dashboard.recent_uploads', lambda: call(views.recent_uploads, user, '/')),
+        ('dashboard.storage_usage', lambda: call(views.storage_usage, user, '/')),
+        ('dashboard.get_stats', lambda: call(views.get_stats, user, '/')),
+        ('dashboard.admin_files', lambda: call(views.admin_files, staff, '/', limit=100)),
+        ('dashboard.admin_files_deep', lambda: call(views.admin_files, staff, '/', limit=100, **({'cursor': cursor} if cursor else {}))),
+    ):
+        samples, response = measure(func, args.repeat)
+        assert response.status_code == 200, f"{name}: HTTP {response.status_code}"
+        with CaptureQueriesContext(connection) as queries:
+            func()
+        results[name] = dict(summarize(samples), queries=len(queries.captured_queries))
+    return results
+
+
+def bench_similarity(workdir, args):
+    from django.contrib.auth.models import User
+    from rest_framework.test import APIRequestFactory, force_authenticate
+    from advanced_mode.views import ReportSimilarityView
+
+    owner = User.objects.create_user('bench-reports', 'bench-reports@example.com', 'bench-password')
+    report_ids = django_env.seed_reports(owner, args.reports)
+    view = ReportSimilarityView.as_view()
+    factory = APIRequestFactory()
+
+    def call():
+        request = factory.post('/', {'report_ids': report_ids}, format='json')
+        force_authenticate(request, user=owner)
+        response = view(request)
+        # The rows are computed while the body is consumed
+        response.body = b''.join(response.streaming_content)
+        return response
+
+    samples, response = measure(call, args.repeat)
+    assert response.status_code == 200, f"similarity: HTTP {response.status_code}"
+    return {'similarity.report_matrix': dict(summarize(samples), reports=len(report_ids), bytes=len(response.body))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--sheets', type=int, default=6)
+    parser.add_argument('--sample-bytes', type=int, default=1024 * 1024)
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--files-per-user', type=int, default=1000)
+    parser.add_argument('--reports', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', nargs='+', choices=SUITES, default=list(SUITES))
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='shapeshifter-bench-') as workdir:
+        django_env.setup(workdir)
+        results = {}
+        for suite in args.only:
+            results.update(globals()[f"bench_{suite}"](workdir, args))
+
+    print_table(results)
+    params = {key: value for key, value in vars(args).items() if key != 'output'}
+    write_results('micro', params, results, args.output)
+    print(f"Results appended to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
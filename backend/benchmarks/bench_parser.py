@@ -0,0 +1,107 @@
+
+"""
+Benchmark: ExcelBehaviorParser (lecture unique, vectorisée) vs l'ancien parser
+(ré-ouverture du classeur par feuille + iterrows).
+
+Usage:
+    python benchmarks/bench_parser.py [--rows 5000] [--sheets 6] [--repeat 3]
+"""
+import os
+import sys
+import time
+import tempfile
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from report_generator import write_report
+from advanced_mode.utils.core.excel_behavior_parser import ExcelBehaviorParser
+
+
+def legacy_extract_signatures(excel_path):
+    """Copie de l'ancien ExcelBehaviorParser.extract_signatures (référence)"""
+    signatures = set()
+    excel_file = pd.ExcelFile(excel_path)
+    for sheet_name in excel_file.sheet_names:
+        df = pd.read_excel(excel_path, sheet_name=sheet_name)
+        df.columns = df.columns.str.lower().str.strip()
+        found = set()
+        if 'technique_id' in df.columns:
+            for val in df['technique_id'].dropna():
+                sig = str(val).strip()
+                if sig and sig != 'nan':
+                    if '-' in sig:
+                        sig = sig.split('-')[-1]
+                    if sig.startswith('T'):
+                        found.add(f"mitre-{sig}")
+        for col in ['signature', 'behavior', 'behaviour', 'action', 'event']:
+            if col in df.columns:
+                for val in df[col].dropna():
+                    sig = str(val).strip()
+                    if sig and sig != 'nan':
+                        if '-' in sig and sig.count('-') > 1:
+                            parts = sig.split('-')
+                            if len(parts) >= 2 and parts[-1].startswith('T'):
+                                sig = f"mitre-{parts[-1]}"
+                        found.add(sig)
+        if 'category' in df.columns and 'action' in df.columns:
+            for _, row in df.iterrows():
+                cat = str(row.get('category', '')).strip()
+                act = str(row.get('action', '')).strip()
+                if cat and cat != 'nan' and act and act != 'nan':
+                    found.add(f"{cat}-{act}")
+        if not found and len(df.columns) > 0:
+            for val in df[df.columns[0]].dropna():
+                sig = str(val).strip()
+                if sig and sig != 'nan':
+                    if '-' in sig and sig.count('-') > 1:
+                        parts = sig.split('-')
+                        if len(parts) >= 2 and parts[-1].startswith('T'):
+                            sig = f"mitre-{parts[-1]}"
+                    else:
+                        sig = f"{sheet_name}-{sig}"
+                    found.add(sig)
+        signatures.update(found)
+    return signatures
+
+
+def best_of(func, path, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(path)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--sheets', type=int, default=6)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        xlsx_path = write_report(os.path.join(tmp, 'report.xlsx'), 'xlsx', args.rows, args.sheets)
+        csv_path = write_report(os.path.join(tmp, 'report.csv'), 'csv', args.rows, args.sheets)
+        print(f"Report: {args.sheets + 1} sheets x {args.rows} rows "
+              f"({os.path.getsize(xlsx_path) / 1024:.0f} KiB)")
+
+        for label, path in (('xlsx', xlsx_path), ('csv', csv_path)):
+            legacy_time, legacy = best_of(legacy_extract_signatures, path, args.repeat) \
+                if label == 'xlsx' else (None, None)
+            new_time, new = best_of(ExcelBehaviorParser.extract_signatures, path, args.repeat)
+
+            if legacy is not None:
+                assert legacy == new, "Signature sets differ from the legacy parser"
+                print(f"[{label}] legacy: {legacy_time * 1000:8.1f} ms   "
+                      f"new: {new_time * 1000:8.1f} ms   "
+                      f"speedup: x{legacy_time / new_time:.2f}   ({len(new)} signatures)")
+            else:
+                print(f"[{label}] new: {new_time * 1000:8.1f} ms   ({len(new)} signatures)")
+
+
+if __name__ == "__main__":
+    main()
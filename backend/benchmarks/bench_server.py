@@ -0,0 +1,47 @@
+"""
+Serveur jetable pour load_test.py: base SQLite et MEDIA_ROOT temporaires,
+tableau de bord pré-rempli, serveur WSGI multi-thread de Django (comme
+runserver, sans autoreload). Affiche le jeton d'API du compte staff sur la
+première ligne de stdout une fois prêt.
+
+Usage:
+    python benchmarks/bench_server.py [--port 8765] [--users 10] [--files-per-user 1000]
+"""
+import os
+import sys
+import logging
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import django_env
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workdir', default=None)
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--files-per-user', type=int, default=1000)
+    args = parser.parse_args()
+
+    django_env.setup(args.workdir)
+    from django.core.servers.basehttp import run
+    from django.core.wsgi import get_wsgi_application
+    from rest_framework.authtoken.models import Token
+
+    staff = django_env.seed_files(args.users, args.files_per_user)[0]
+    token, _ = Token.objects.get_or_create(user=staff)
+
+    application = get_wsgi_application()  # Applies LOGGING again: quiet the loggers afterwards
+    # One access log line per request would dominate the run
+    logging.getLogger('django.server').setLevel(logging.WARNING)
+    logging.getLogger('backend.middleware').setLevel(logging.ERROR)
+
+    print(token.key, flush=True)
+    run(args.host, args.port, application, threading=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+
+"""
+Benchmark: requêtes sur l'index inversé des signatures (SignaturePosting).
+
+Usage:
+    python benchmarks/bench_signature_index.py [--reports 20000] [--vocabulary 5000] [--signatures 60]
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import django_env
+
+
+def populate(reports, vocabulary, signatures, seed=0):
+    from django.contrib.auth.models import User
+    from advanced_mode.models import BehaviorReport, Signature, SignaturePosting
+    from advanced_mode.reports import encode_ids
+
+    rng = np.random.default_rng(seed)
+    owner = User.objects.create_user('bench', 'bench@example.com', 'bench')
+    Signature.objects.bulk_create([Signature(name=f"mitre-T{1000 + i}") for i in range(vocabulary)], batch_size=1000)
+    vocab_ids = np.array(Signature.objects.order_by('id').values_list('id', flat=True))
+
+    # Zipf-like popularity so that some signatures are very common
+    weights = 1.0 / np.arange(1, vocabulary + 1)
+    weights /= weights.sum()
+
+    batch = []
+    for n in range(reports):
+        size = int(rng.integers(signatures // 2, signatures * 2))
+        ids = np.sort(rng.choice(vocab_ids, size=size, replace=False, p=weights)).astype('<u4')
+        batch.append(BehaviorReport(owner=owner, name=f"report-{n}.xlsx", content_hash=f"{n:064x}",
+                                    signature_ids=encode_ids(ids), signature_count=len(ids)))
+    BehaviorReport.objects.bulk_create(batch, batch_size=1000)
+
+    postings = []
+    for report in BehaviorReport.objects.only('id', 'signature_ids').iterator():
+        postings.extend(SignaturePosting(signature_id=int(i), report_id=report.id)
+                        for i in np.frombuffer(bytes(report.signature_ids), dtype='<u4'))
+        if len(postings) > 50000:
+            SignaturePosting.objects.bulk_create(postings, batch_size=5000)
+            postings = []
+    SignaturePosting.objects.bulk_create(postings, batch_size=5000)
+    return owner
+
+
+def timed(label, func, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    print(f"  {label:<40} {min(timings) * 1000:8.2f} ms   ({result})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--reports', type=int, default=20000)
+    parser.add_argument('--vocabulary', type=int, default=5000)
+    parser.add_argument('--signatures', type=int, default=60)
+    args = parser.parse_args()
+
+    django_env.setup()
+    from advanced_mode.models import BehaviorReport, SignaturePosting
+    from advanced_mode.signature_index import reports_matching, cooccurring_signatures
+
+    start = time.perf_counter()
+    populate(args.reports, args.vocabulary, args.signatures)
+    print(f"Indexed {args.reports} reports / {SignaturePosting.objects.count()} postings "
+          f"in {time.perf_counter() - start:.1f} s")
+
+    reports = BehaviorReport.objects.all()
+    common, rare = ["mitre-T1000", "mitre-T1001"], ["mitre-T1000", "mitre-T4000"]
+
+    def page(qs, size=50):
+        return len(list(qs[:size]))
+
+    timed("all(common pair) count", lambda: reports_matching(reports, common, 'all').count())
+    timed("all(common pair) first page", lambda: page(reports_matching(reports, common, 'all').order_by('-id')))
+    timed("all(rare pair) count", lambda: reports_matching(reports, rare, 'all').count())
+    timed("any(3 signatures) first page",
+          lambda: page(reports_matching(reports, common + ["mitre-T2500"], 'any').order_by('-id')))
+    timed("co-occurring(mitre-T1500) top 20", lambda: page(cooccurring_signatures(reports, ["mitre-T1500"]), 20))
+
+
+if __name__ == "__main__":
+    main()
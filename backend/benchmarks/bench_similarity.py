@@ -0,0 +1,75 @@
+
+"""
+Benchmark: matrice de similarité de Jaccard (bitsets NumPy) pour une cohorte
+de rapports, comparée au calcul paire par paire sur des set[str].
+
+Usage:
+    python benchmarks/bench_similarity.py [--reports 1000 2000] [--vocabulary 5000] [--signatures 300]
+"""
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from advanced_mode.utils.core.similarity import pack_bitsets, jaccard_matrix
+
+
+def make_cohort(reports, vocabulary, signatures, seed=0):
+    rng = np.random.default_rng(seed)
+    sizes = rng.integers(signatures // 2, signatures * 2, size=reports)
+    return [np.sort(rng.choice(vocabulary, size=min(int(s), vocabulary), replace=False)).astype('<u4')
+            for s in sizes]
+
+
+def pairwise_sets(id_arrays):
+    sets = [set(f"sig-{i}" for i in ids) for ids in id_arrays]
+    n = len(sets)
+    out = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(n):
+            total = len(sets[i] | sets[j])
+            out[i][j] = len(sets[i] & sets[j]) / total if total else 0
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--reports', type=int, nargs='+', default=[1000, 2000])
+    parser.add_argument('--vocabulary', type=int, default=5000)
+    parser.add_argument('--signatures', type=int, default=300)
+    args = parser.parse_args()
+
+    # Vérification sur une petite cohorte
+    sample = make_cohort(60, args.vocabulary, args.signatures, seed=1)
+    expected = np.array(pairwise_sets(sample), dtype=np.float32)
+    assert np.allclose(jaccard_matrix(pack_bitsets(sample)), expected, atol=1e-6)
+
+    start = time.perf_counter()
+    pairwise_sets(sample)
+    per_pair = (time.perf_counter() - start) / (len(sample) ** 2)
+
+    for n in args.reports:
+        cohort = make_cohort(n, args.vocabulary, args.signatures)
+        id_bytes = sum(ids.nbytes for ids in cohort)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        bitsets = pack_bitsets(cohort)
+        packed = time.perf_counter()
+        matrix = jaccard_matrix(bitsets)
+        done = time.perf_counter()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"[{n} reports] ids: {id_bytes / 1024:.0f} KiB  bitsets: {bitsets.nbytes / 1024:.0f} KiB  "
+              f"matrix: {matrix.nbytes / 1024 / 1024:.1f} MiB  peak: {peak / 1024 / 1024:.1f} MiB")
+        print(f"    pack: {(packed - start) * 1000:.1f} ms  matrix: {(done - packed) * 1000:.1f} ms  "
+              f"(set pairwise estimate: {per_pair * n * n:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark: démarrage d'un worker Django (cold start). Chaque mesure lance un
+nouvel interpréteur qui fait ce qu'un worker WSGI fait avant sa première
+requête: django.setup(), chargement de l'application WSGI et de toutes les
+URLs (donc de toutes les vues). Mesure le temps de démarrage, la mémoire
+résidente (RSS) de base, et un rapport `python -X importtime` des imports
+les plus coûteux.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 10] [--top 15]
+        [--output benchmarks/results/results.jsonl]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from results import DEFAULT_OUTPUT, percentile, summarize, write_results
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dépendances lourdes qui ne doivent être chargées qu'au premier usage
+HEAVY_MODULES = ('pandas', 'numpy', 'openpyxl', 'python_calamine', 'ssdeep', 'lief')
+
+BOOT = r"""
+import time
+start = time.perf_counter()
+import json, os, sys
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns  # importe toutes les vues, comme la première requête
+from backend.wsgi import application
+elapsed = time.perf_counter() - start
+
+def rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+    except ImportError:
+        return None
+
+print(json.dumps({'boot_s': elapsed, 'rss_mb': rss_mb(), 'modules': sorted(sys.modules)}))
+"""
+
+
+def run_boot(importtime=False):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE='backend.settings')
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', BOOT]
+    start = time.perf_counter()
+    process = subprocess.run(command, cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if process.returncode != 0:
+        raise RuntimeError(f"Worker boot failed:\n{process.stderr}")
+    return wall, json.loads(process.stdout.strip().splitlines()[-1]), process.stderr
+
+
+def parse_importtime(stderr):
+    """Lignes 'import time: self | cumulative | module' -> [(module, self_us, cumulative_us)]"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        imports.append((module.strip(), int(self_us), int(cumulative_us), len(module) - len(module.lstrip())))
+    return imports
+
+
+def top_level_packages(imports, top):
+    """Coût cumulé par paquet de premier niveau (un paquet n'est importé qu'une fois)"""
+    totals = {}
+    for module, _, cumulative_us, _ in imports:
+        package = module.split('.')[0]
+        totals[package] = max(totals.get(package, 0), cumulative_us)
+    return sorted(totals.items(), key=lambda item: -item[1])[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    run_boot()  # Réchauffe le cache disque et les .pyc
+    walls, boots, rss = [], [], []
+    for _ in range(args.repeat):
+        wall, report, _ = run_boot()
+        walls.append(wall)
+        boots.append(report['boot_s'])
+        if report['rss_mb'] is not None:
+            rss.append(report['rss_mb'])
+    heavy = [m for m in HEAVY_MODULES if m in report['modules']]
+
+    _, _, stderr = run_boot(importtime=True)
+    packages = top_level_packages(parse_importtime(stderr), args.top)
+
+    print(f"Worker boot (django.setup + URLconf + WSGI app), {args.repeat} runs")
+    print(f"  process  p50 {percentile(sorted(walls), 50) * 1000:7.1f} ms  (interpreter included)")
+    print(f"  boot     p50 {percentile(sorted(boots), 50) * 1000:7.1f} ms")
+    if rss:
+        print(f"  RSS      p50 {percentile(sorted(rss), 50):7.1f} MiB")
+    print(f"  heavy modules loaded at boot: {', '.join(heavy) or 'none'}")
+    print(f"\nSlowest top-level imports (-X importtime, cumulative):")
+    for package, cumulative_us in packages:
+        print(f"  {package:<30} {cumulative_us / 1000:8.1f} ms")
+
+    results = {
+        'startup.process': summarize(walls),
+        'startup.boot': dict(
+            summarize(boots),
+            rss_mb=percentile(sorted(rss), 50) if rss else None,
+            modules=len(report['modules']),
+            heavy_modules=heavy,
+            top_imports_ms={package: us / 1000 for package, us in packages},
+        ),
+    }
+    params = {key: value for key, value in vars(args).items() if key != 'output'}
+    write_results('startup', params, results, args.output)
+    print(f"\nResults appended to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
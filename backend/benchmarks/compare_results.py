@@ -0,0 +1,74 @@
+"""
+Compare deux exécutions enregistrées par bench_micro.py, load_test.py ou
+bench_startup.py.
+Par défaut: les deux dernières exécutions de la suite dans le fichier.
+
+Usage:
+    python benchmarks/compare_results.py [--suite micro|load|startup] [--file results.jsonl]
+        [--baseline -2] [--candidate -1] [--threshold 10]
+"""
+import os
+import sys
+import json
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from results import DEFAULT_OUTPUT
+
+METRICS = ('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps', 'rss_mb')
+
+
+def load_runs(path, suite):
+    with open(path, encoding='utf-8') as f:
+        runs = [json.loads(line) for line in f if line.strip()]
+    return [run for run in runs if run['suite'] == suite]
+
+
+def change(before, after):
+    if before is None or after is None or before == 0:
+        return None
+    return (after - before) / before * 100
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--file', default=DEFAULT_OUTPUT)
+    parser.add_argument('--suite', choices=('micro', 'load', 'startup'), default='micro')
+    parser.add_argument('--baseline', type=int, default=-2, help="Run index (negative: from the end)")
+    parser.add_argument('--candidate', type=int, default=-1)
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help="Flag latency increases / throughput drops above this percentage")
+    args = parser.parse_args()
+
+    runs = load_runs(args.file, args.suite)
+    if len(runs) < 2:
+        sys.exit(f"Need at least two '{args.suite}' runs in {args.file}, found {len(runs)}")
+    baseline, candidate = runs[args.baseline], runs[args.candidate]
+    print(f"baseline:  {baseline['timestamp']} ({baseline['commit']})")
+    print(f"candidate: {candidate['timestamp']} ({candidate['commit']})")
+    if baseline['params'] != candidate['params']:
+        print("warning: the runs used different parameters")
+
+    regressions = 0
+    print(f"{'benchmark':<32} {'metric':<15} {'baseline':>10} {'candidate':>10} {'change':>9}")
+    for name, after in candidate['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            continue
+        for metric in METRICS:
+            delta = change(before.get(metric), after.get(metric))
+            if delta is None:
+                continue
+            # Lower latency is better, higher throughput is better
+            worse = -delta if metric == 'throughput_rps' else delta
+            flag = " !" if worse > args.threshold else ""
+            regressions += bool(flag)
+            print(f"{name:<32} {metric:<15} {before[metric]:>10.2f} {after[metric]:>10.2f} {delta:>+8.1f}%{flag}")
+
+    print(f"{regressions} regression(s) above {args.threshold:g}%")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Django setup for benchmarks: throwaway SQLite database and media root"""
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup(workdir=None):
+    """Configure Django against a fresh database in `workdir` and migrate it"""
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+    import django
+    from django.conf import settings
+    from django.core.management import call_command
+
+    workdir = workdir or tempfile.mkdtemp(prefix='shapeshifter-bench-')
+    settings.DATABASES['default']['NAME'] = os.path.join(workdir, 'bench.sqlite3')
+    settings.MEDIA_ROOT = os.path.join(workdir, 'media')
+    settings.FILE_UPLOAD_TEMP_DIR = os.path.join(workdir, 'media', 'tmp')
+    django.setup()
+    call_command('migrate', verbosity=0)
+    return workdir
+
+
+def seed_files(users=10, files_per_user=1000, size=64 * 1024, seed=0):
+    """
+    Fill the dashboard tables: `users` accounts (the first one is staff)
+    with `files_per_user` UserFile rows each. Rows point at blob names
+    without content: only the database is exercised. Returns the users.
+    """
+    import random
+
+    from django.contrib.auth.models import User
+    from files.storage import blob_name
+    from users.history import record_files
+    from users.models import UserFile
+
+    rng = random.Random(seed)
+    accounts = [
+        User.objects.create_user(f"bench{i}", f"bench{i}@example.com", 'bench-password', is_staff=(i == 0))
+        for i in range(users)
+    ]
+    # The bulk history path: one transaction and one signal per user's batch
+    for user in accounts:
+        record_files([
+            UserFile(
+                user=user,
+                file=blob_name(f"{rng.getrandbits(256):064x}"),
+                original_name=f"sample{j}.exe",
+                size=rng.randint(size // 2, size * 2),
+            )
+            for j in range(files_per_user)
+        ], batch_size=1000)
+    return accounts
+
+
+def seed_reports(owner, reports=1000, vocabulary=5000, signatures=300, seed=0):
+    """
+    Store `reports` behavior reports for `owner`, each with a random subset
+    of a `vocabulary` of signature names (`signatures` on average), through
+    the same registry as uploads. Returns the report ids.
+    """
+    import random
+
+    from advanced_mode.reports import register_report
+
+    rng = random.Random(seed)
+    names = [f"mitre-T{i:05d}" for i in range(vocabulary)]
+    return [
+        register_report(
+            owner, f"report{i}.csv", f"{rng.getrandbits(256):064x}",
+            rng.sample(names, min(vocabulary, rng.randint(signatures // 2, signatures * 2))),
+        ).id
+        for i in range(reports)
+    ]
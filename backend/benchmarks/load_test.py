@@ -0,0 +1,208 @@
+"""
+Test de charge HTTP local: ExperimentAnalyzeView, UserFileUploadView,
+admin_files et storage_usage. Mesure la latence (p50/p95/p99) et le débit
+par endpoint et ajoute les résultats à un fichier JSON Lines.
+
+Sans --url, un serveur jetable (bench_server.py) est démarré dans un autre
+processus, avec sa propre base et son propre MEDIA_ROOT. Avec --url, il faut
+un jeton d'un compte staff (--token).
+
+Usage:
+    python benchmarks/load_test.py [--requests 200] [--concurrency 8]
+        [--endpoints analyze upload admin_files storage_usage]
+        [--report-rows 2000] [--report-sheets 4] [--report-format xlsx]
+        [--upload-bytes 65536] [--url http://127.0.0.1:8000 --token TOKEN]
+"""
+import os
+import sys
+import time
+import uuid
+import socket
+import tempfile
+import argparse
+import itertools
+import subprocess
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from report_generator import FORMATS, write_report
+from results import DEFAULT_OUTPUT, print_table, summarize, write_results
+
+ENDPOINTS = ('analyze', 'upload', 'admin_files', 'storage_usage')
+
+
+def encode_multipart(fields, files):
+    """fields: {nom: valeur}, files: {nom: (nom_fichier, contenu)} -> (corps, content-type)"""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        )
+    for name, (filename, content) in files.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f'Content-Type: application/octet-stream\r\n\r\n'.encode() + content + b'\r\n'
+        )
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+class Target:
+    def __init__(self, url, token):
+        self.url = url.rstrip('/')
+        self.headers = {'Authorization': f'Token {token}'}
+
+    def request(self, method, path, body=None, content_type=None):
+        headers = dict(self.headers)
+        if content_type:
+            headers['Content-Type'] = content_type
+        request = urllib.request.Request(self.url + path, data=body, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=300) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+
+def request_factories(args, reports):
+    """endpoint -> fonction qui prépare une requête (hors mesure): (méthode, chemin, corps, content-type)"""
+    pairs = itertools.cycle(list(zip(reports, reports[1:] + reports[:1])))
+    lock = threading.Lock()
+
+    def analyze():
+        with lock:
+            original, variant = next(pairs)
+        body, content_type = encode_multipart(
+            {'rate_original': 60, 'rate_variant': 30},
+            {'excel_original': original, 'excel_variant': variant},
+        )
+        return 'POST', '/api/advanced/analyze/', body, content_type
+
+    def upload():
+        # Contenu unique: chaque envoi est stocké (pas de déduplication)
+        body, content_type = encode_multipart({}, {'file': ('sample.exe', os.urandom(args.upload_bytes))})
+        return 'POST', '/api/users/upload/', body, content_type
+
+    return {
+        'analyze': analyze,
+        'upload': upload,
+        'admin_files': lambda: ('GET', '/api/users/files/admin/?limit=100', None, None),
+        'storage_usage': lambda: ('GET', '/api/users/storage/', None, None),
+    }
+
+
+def run_endpoint(target, prepare, requests, concurrency):
+    samples, errors = [], 0
+    lock = threading.Lock()
+
+    def one(_):
+        nonlocal errors
+        method, path, body, content_type = prepare()
+        start = time.perf_counter()
+        try:
+            status = target.request(method, path, body, content_type)
+        except OSError:
+            status = None
+        elapsed = time.perf_counter() - start
+        with lock:
+            if status is not None and 200 <= status < 300:
+                samples.append(elapsed)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    return summarize(samples, elapsed=time.perf_counter() - start, errors=errors)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(workdir, args):
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_server.py'),
+         '--port', str(port), '--workdir', workdir,
+         '--users', str(args.users), '--files-per-user', str(args.files_per_user)],
+        stdout=subprocess.PIPE, text=True,
+    )
+    token = process.stdout.readline().strip()
+    if not token:
+        process.kill()
+        raise RuntimeError("bench_server.py exited before it was ready")
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            break
+        except OSError:
+            time.sleep(0.1)
+    return process, url, token
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default=None)
+    parser.add_argument('--token', default=None)
+    parser.add_argument('--endpoints', nargs='+', choices=ENDPOINTS, default=list(ENDPOINTS))
+    parser.add_argument('--requests', type=int, default=200, help="Requests per endpoint")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--warmup', type=int, default=5, help="Unmeasured requests per endpoint")
+    parser.add_argument('--report-rows', type=int, default=2000)
+    parser.add_argument('--report-sheets', type=int, default=4)
+    parser.add_argument('--report-format', choices=FORMATS, default='xlsx')
+    parser.add_argument('--report-pool', type=int, default=4, help="Distinct reports sent to analyze; after the first pass they come from the signature cache")
+    parser.add_argument('--upload-bytes', type=int, default=64 * 1024)
+    parser.add_argument('--users', type=int, default=10, help="Seeded accounts (local server only)")
+    parser.add_argument('--files-per-user', type=int, default=1000, help="Seeded files (local server only)")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+    if args.url and not args.token:
+        parser.error("--url requires --token (staff account)")
+
+    with tempfile.TemporaryDirectory(prefix='shapeshifter-load-') as workdir:
+        reports = []
+        for seed in range(max(args.report_pool, 2)):
+            name = f"report{seed}.{args.report_format}"
+            path = write_report(os.path.join(workdir, name), args.report_format,
+                                args.report_rows, args.report_sheets, seed)
+            with open(path, 'rb') as f:
+                reports.append((name, f.read()))
+
+        server = None
+        if args.url:
+            target = Target(args.url, args.token)
+        else:
+            server, url, token = start_server(workdir, args)
+            target = Target(url, token)
+            print(f"Local server: {url}")
+
+        try:
+            factories = request_factories(args, reports)
+            results = {}
+            for endpoint in args.endpoints:
+                run_endpoint(target, factories[endpoint], args.warmup, 1)
+                results[endpoint] = run_endpoint(target, factories[endpoint], args.requests, args.concurrency)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    print_table(results)
+    params = {key: value for key, value in vars(args).items() if key not in ('output', 'token')}
+    write_results('load', params, results, args.output)
+    print(f"Results appended to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Générateur de rapports de sandbox synthétiques (Excel, CSV, JSON) pour les
+benchmarks et les tests de charge.
+
+Usage:
+    python benchmarks/report_generator.py OUT_DIR [--format xlsx csv json]
+        [--rows 5000] [--sheets 6] [--count 1] [--seed 0]
+"""
+import os
+import json
+import random
+import argparse
+
+import pandas as pd
+
+FORMATS = ('xlsx', 'csv', 'json')
+
+CATEGORIES = ['process', 'file', 'registry', 'network', 'memory']
+ACTIONS = ['create', 'delete', 'write', 'read', 'inject', 'connect']
+
+
+def make_sheet(rows, rng):
+    """Feuille au format des exports sandbox (colonnes reconnues + bruit)"""
+    return pd.DataFrame({
+        'Timestamp': [rng.random() for _ in range(rows)],
+        'Technique_ID': [f"attack-pattern-T{rng.randint(1000, 1600)}" for _ in range(rows)],
+        'Category': [rng.choice(CATEGORIES) for _ in range(rows)],
+        'Action': [rng.choice(ACTIONS) for _ in range(rows)],
+        'Behavior': [f"behavior-{rng.randint(0, 500)}" for _ in range(rows)],
+        'Details': ['x' * 40 for _ in range(rows)],
+    })
+
+
+def make_frames(rows, sheets, seed=0):
+    """`sheets` feuilles reconnues + une feuille sans colonne reconnue (auto-détection)"""
+    rng = random.Random(seed)
+    frames = {f"Sheet{i}": make_sheet(rows, rng) for i in range(sheets)}
+    frames['Processes'] = pd.DataFrame({'Name': [f"proc{i}.exe" for i in range(rows)]})
+    return frames
+
+
+def write_report(path, fmt, rows, sheets, seed=0):
+    """
+    Écrit un rapport `fmt` (xlsx, csv ou json) et renvoie son chemin.
+    Le CSV n'a qu'une feuille; le JSON est un objet {feuille: [enregistrements]}.
+    """
+    frames = make_frames(rows, sheets, seed)
+    if fmt == 'xlsx':
+        with pd.ExcelWriter(path) as writer:
+            for name, df in frames.items():
+                df.to_excel(writer, sheet_name=name, index=False)
+    elif fmt == 'csv':
+        frames['Sheet0'].to_csv(path, index=False)
+    elif fmt == 'json':
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({name: df.to_dict(orient='records') for name, df in frames.items()}, f)
+    else:
+        raise ValueError(f"Unknown report format: {fmt}")
+    return path
+
+
+def write_reports(directory, formats=FORMATS, rows=5000, sheets=6, count=1, seed=0):
+    """`count` rapports par format (graines seed, seed+1, ...), renvoie les chemins"""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        for fmt in formats:
+            path = os.path.join(directory, f"report-{rows}x{sheets}-{seed + i}.{fmt}")
+            paths.append(write_report(path, fmt, rows, sheets, seed + i))
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('directory')
+    parser.add_argument('--format', nargs='+', choices=FORMATS, default=list(FORMATS))
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--sheets', type=int, default=6)
+    parser.add_argument('--count', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    for path in write_reports(args.directory, args.format, args.rows, args.sheets, args.count, args.seed):
+        print(f"{path} ({os.path.getsize(path) / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
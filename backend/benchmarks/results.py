@@ -0,0 +1,92 @@
+"""
+Résultats de benchmark lisibles par machine: une ligne JSON par exécution
+(JSON Lines), avec le contexte nécessaire pour comparer des exécutions
+(commit git, version de Python, machine). Voir compare_results.py.
+"""
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results', 'results.jsonl')
+
+
+def percentile(sorted_samples, q):
+    """Percentile q (0-100) par interpolation linéaire d'échantillons triés"""
+    if not sorted_samples:
+        return None
+    position = (len(sorted_samples) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_samples) - 1)
+    return sorted_samples[lower] + (sorted_samples[upper] - sorted_samples[lower]) * (position - lower)
+
+
+def summarize(samples, elapsed=None, errors=0):
+    """Latences en secondes -> statistiques en ms (+ débit si `elapsed` est donné)"""
+    ordered = sorted(sample * 1000 for sample in samples)
+    summary = {
+        'count': len(ordered),
+        'errors': errors,
+        'min_ms': ordered[0] if ordered else None,
+        'mean_ms': sum(ordered) / len(ordered) if ordered else None,
+        'p50_ms': percentile(ordered, 50),
+        'p95_ms': percentile(ordered, 95),
+        'p99_ms': percentile(ordered, 99),
+        'max_ms': ordered[-1] if ordered else None,
+    }
+    if elapsed:
+        summary['throughput_rps'] = len(ordered) / elapsed
+    return summary
+
+
+def measure(func, repeat, warmup=1):
+    """Exécute `func` warmup + repeat fois, renvoie (latences, dernier résultat)"""
+    result = None
+    for _ in range(warmup):
+        result = func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - start)
+    return samples, result
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=10,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def write_results(suite, params, results, output=DEFAULT_OUTPUT):
+    """Ajoute une exécution à `output` et la renvoie"""
+    run = {
+        'suite': suite,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'params': params,
+        'results': results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(run) + '\n')
+    return run
+
+
+def print_table(results):
+    """Affiche {nom: résumé} sous forme de tableau"""
+    print(f"{'benchmark':<40} {'n':>6} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'req/s':>9}")
+    for name, s in results.items():
+        rps = f"{s['throughput_rps']:9.1f}" if s.get('throughput_rps') else f"{'':>9}"
+        p = [f"{s[k]:10.2f}" if s[k] is not None else f"{'-':>10}" for k in ('p50_ms', 'p95_ms', 'p99_ms')]
+        errors = f"  ({s['errors']} errors)" if s.get('errors') else ""
+        print(f"{name:<40} {s['count']:>6} {' '.join(p)} {rps}{errors}")
@@ -1,22 +1,29 @@
 import os
 import hashlib
-from django.conf import settings
+import logging
+from django.core.files.base import ContentFile
+from files.storage import blob_storage
 from .engine.perturbations.registry import PerturbationRegistry
+from backend.metrics import timed
+
+logger = logging.getLogger(__name__)
 
 class MalwareMutator:
     def __init__(self):
         self.registry = PerturbationRegistry()
 
-    def process(self, input_path, perturbation="section_append"):
+    def process(self, input_path, perturbation="section_append", filename=None):
         """
-        Reads the input file, applies the perturbation, and saves the output.
+        Reads the input file, applies the perturbation, and saves the output
+        in the content-addressed blob storage. `filename` is the original
+        name of the input (defaults to its basename on disk).
         
         Returns:
             dict: {
                 "original_md5": str,
                 "variant_md5": str,
-                "variant_path": str, # Relative to MEDIA_ROOT
-                "variant_url": str,
+                "variant_path": str, # Absolute path of the variant blob
+                "variant_name": str, # Display name of the variant
                 "size_diff": int
             }
         """
@@ -32,46 +39,35 @@ class MalwareMutator:
 
         # 2. Apply Perturbation
         try:
-            print("DEBUG: Applying perturbation using registry...")
-            modified_data = self.registry.apply(perturbation, original_data)
-        except Exception as e:
+            logger.debug("applying perturbation", extra={"perturbation": perturbation})
+            with timed("perturbation"):
+                modified_data = self.registry.apply(perturbation, original_data)
+        except Exception:
             # Fallback: Simple Append (Headless/Blind)
-            import traceback
-            traceback.print_exc()
-            print(f"ERROR: Advanced perturbation engine failed: {e}")
-            print("WARNING: Switching to fallback (Simple Append).")
+            logger.exception("perturbation engine failed, falling back to simple append",
+                             extra={"perturbation": perturbation})
             
             import random
             
             # Append 20-100 random bytes
             extra = bytes([random.randint(0, 255) for _ in range(random.randint(20, 100))])
             modified_data = original_data + extra
-            print("DEBUG: Fallback applied successfully.")
 
         variant_md5 = hashlib.md5(modified_data).hexdigest()
         variant_size = len(modified_data)
 
-        # 3. Save Variant
-        # Ensure directory exists
-        variants_dir = os.path.join(settings.MEDIA_ROOT, 'uploads', 'variants')
-        os.makedirs(variants_dir, exist_ok=True)
-
-        filename = os.path.basename(input_path)
+        # 3. Save Variant (stored once per content)
+        filename = filename or os.path.basename(input_path)
         variant_filename = f"{filename}.{perturbation}.exe"
-        variant_path = os.path.join(variants_dir, variant_filename)
-
-        with open(variant_path, 'wb') as f:
-            f.write(modified_data)
+        variant_blob = blob_storage.save(variant_filename, ContentFile(modified_data))
+        variant_path = blob_storage.path(variant_blob)
 
         # 4. Construct Result
-        # Relative path for URL construction
-        relative_path = os.path.join('uploads', 'variants', variant_filename).replace('\\', '/')
-        
         return {
             "original_md5": original_md5,
             "variant_md5": variant_md5,
             "variant_path": variant_path.replace('\\', '/'), # Ensure POSIX path
-            "variant_url": f"{settings.MEDIA_URL}{relative_path}",
+            "variant_name": variant_filename,
             "original_size": original_size,
             "variant_size": variant_size,
             "size_diff": variant_size - original_size
@@ -4,9 +4,16 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework import status
 import os
+import logging
 from django.conf import settings
+from django.urls import reverse
+from users.history import record_files
 from users.models import UserFile
+from files.storage import blob_storage
 from .services import MalwareMutator
+from backend.metrics import timed
+
+logger = logging.getLogger(__name__)
 
 
 class MutatePayloadView(APIView):
@@ -19,38 +26,32 @@ class MutatePayloadView(APIView):
         if not file_obj:
             return Response({"error": "No file provided"}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Save original file temporarily
-        upload_dir = os.path.join(settings.MEDIA_ROOT, 'uploads', 'original')
-        os.makedirs(upload_dir, exist_ok=True)
-        
-        file_path = os.path.join(upload_dir, file_obj.name)
-        
         try:
-            print(f"DEBUG: Processing file {file_path}")
-            with open(file_path, 'wb+') as destination:
-                for chunk in file_obj.chunks():
-                    destination.write(chunk)
+            # Store the original (deduplicated by content, never overwritten)
+            file_path = blob_storage.path(blob_storage.save(file_obj.name, file_obj))
+            logger.debug("mutating upload", extra={"file": file_path})
 
-            print("DEBUG: Starting mutation...")
             mutator = MalwareMutator()
-            result = mutator.process(file_path)
-            print(f"DEBUG: Mutation success: {result}")
+            result = mutator.process(file_path, filename=file_obj.name)
 
             # Save to Database for History using UserFile (users app)
             relative_db_path = os.path.relpath(result['variant_path'], settings.MEDIA_ROOT).replace('\\', '/')
-            print(f"DEBUG: Saving to DB: {relative_db_path}")
-
-            UserFile.objects.create(
-                user=request.user,
-                file=relative_db_path
-            )
-            print("DEBUG: DB Save success")
+            with timed("db_write"):
+                # One transaction for the row and its counter / blob / index updates
+                variant, = record_files([UserFile(
+                    user=request.user,
+                    file=relative_db_path,
+                    original_name=result['variant_name'][:255]
+                )])
+            # Served to its owner only, like the rest of the history
+            result['variant_url'] = reverse('file_download', args=[variant.pk])
+            logger.info("variant stored", extra={
+                "user": request.user.pk, "variant": result['variant_name'], "variant_md5": result['variant_md5'],
+            })
             
             return Response(result, status=status.HTTP_200_OK)
 
 
         except Exception as e:
-            print(f"ERROR in MutatePayloadView: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("mutation failed", extra={"upload": file_obj.name})
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -1,4 +1,5 @@
 from django.contrib import admin
-from .models import File
+from .models import Blob, File
 
 admin.site.register(File)
+admin.site.register(Blob)
@@ -0,0 +1,137 @@
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, quote_etag
+
+from .storage import blob_storage
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Stored files are samples and reports: never let a browser render them
+CONTENT_TYPE = 'application/octet-stream'
+
+
+def get_options():
+    options = getattr(settings, 'FILE_DOWNLOADS', {})
+    return {
+        'MODE': options.get('MODE', 'stream'),
+        'ACCEL_REDIRECT_LOCATION': options.get('ACCEL_REDIRECT_LOCATION', '/protected-media/'),
+        'CHUNK_SIZE': options.get('CHUNK_SIZE', DEFAULT_CHUNK_SIZE),
+    }
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header, size):
+    """
+    (start, end) of a single `bytes=` range, inclusive. None when the whole
+    file should be sent instead (no header, other units, several ranges or
+    an invalid range: a server may ignore those).
+    """
+    units, _, spec = (header or '').partition('=')
+    if units.strip().lower() != 'bytes' or ',' in spec:
+        return None
+    # ASCII digits only: str.isdigit() also accepts '²', which int() rejects
+    match = re.fullmatch(r'(\d*)-(\d*)', spec.strip(), re.ASCII)
+    if match is None or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+
+    if first == '':
+        # Suffix range: the last N bytes
+        if int(last) == 0 or size == 0:
+            raise RangeNotSatisfiable
+        return max(size - int(last), 0), size - 1
+
+    start = int(first)
+    if start >= size:
+        raise RangeNotSatisfiable
+    end = int(last) if last else size - 1
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def read_range(path, start, length, chunk_size):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(chunk_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def file_response(request, name, filename, sha256=''):
+    """
+    Download response for stored file `name` (relative to MEDIA_ROOT), after
+    the caller checked access. The ETag is the content hash, so unchanged
+    files are answered with 304, and single byte ranges get 206.
+
+    In 'stream' mode the file is read in chunks, never whole. In
+    'x-sendfile' (Apache, lighttpd) and 'x-accel-redirect' (nginx) modes the
+    front server sends the file; nginx needs an `internal` location at
+    ACCEL_REDIRECT_LOCATION aliasing MEDIA_ROOT.
+    """
+    path = blob_storage.path(name)
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        raise Http404("File not found")
+
+    etag = quote_etag(sha256) if sha256 else None
+    if etag:
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+
+    options = get_options()
+    if options['MODE'] == 'x-sendfile':
+        response = HttpResponse(content_type=CONTENT_TYPE)
+        response['X-Sendfile'] = path
+    elif options['MODE'] == 'x-accel-redirect':
+        response = HttpResponse(content_type=CONTENT_TYPE)
+        response['X-Accel-Redirect'] = options['ACCEL_REDIRECT_LOCATION'].rstrip('/') + '/' + quote(name)
+    else:
+        response = stream_response(request, path, size, etag, options['CHUNK_SIZE'])
+
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    response['Accept-Ranges'] = 'bytes'
+    if etag:
+        response['ETag'] = etag
+    # Authenticated content: browsers may keep it but must revalidate (cheap with the ETag)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def stream_response(request, path, size, etag, chunk_size):
+    byte_range = None
+    if_range = request.headers.get('If-Range')
+    # A Range only applies to the version the client already has part of
+    if if_range is None or (etag and if_range == etag):
+        try:
+            byte_range = parse_range(request.headers.get('Range'), size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    if byte_range is None:
+        response = FileResponse(open(path, 'rb'), content_type=CONTENT_TYPE)
+        response.block_size = chunk_size
+        return response
+
+    start, end = byte_range
+    response = StreamingHttpResponse(
+        read_range(path, start, end - start + 1, chunk_size), status=206, content_type=CONTENT_TYPE,
+    )
+    response['Content-Length'] = str(end - start + 1)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
@@ -0,0 +1,108 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from files.models import Blob, File
+from files.storage import BLOB_PREFIX, blob_name, blob_storage
+from advanced_mode.models import BehaviorReport
+from users.models import UserFile
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete stored blobs that no UserFile/File/BehaviorReport references. Blobs still hard-linked "
+        "or copied elsewhere under MEDIA_ROOT (advanced mode working copies) are kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only report what would be deleted")
+        parser.add_argument('--recount', action='store_true',
+                            help="Recompute reference counts from the UserFile, File and BehaviorReport tables first")
+        parser.add_argument('--grace', type=int, default=3600,
+                            help="Keep blobs written or reused within this many seconds (default: 3600)")
+
+    def handle(self, *args, **options):
+        if options['recount']:
+            self.recount()
+
+        cutoff = time.time() - options['grace']
+        # Blobs with working copies under advanced/ are in use, whether the copy is a
+        # hard link (also visible in st_nlink) or a plain copy (not visible there)
+        copied = blob_storage.working_copies()
+        known = set()
+        deleted = freed = 0
+
+        for blob in Blob.objects.iterator():
+            known.add(blob.sha256)
+            if blob.ref_count > 0 or blob.sha256 in copied:
+                continue
+            path = blob_storage.path(blob_name(blob.sha256))
+            if not self.collectable(path, cutoff):
+                continue
+            if not options['dry_run']:
+                # The row goes only if it is still unreferenced: an upload of the
+                # same content since the scan above has incremented ref_count
+                removed, _ = Blob.objects.filter(pk=blob.pk, ref_count__lte=0).delete()
+                if not removed:
+                    continue
+                # Re-checked right before unlinking (new working copy, reuse refreshing the mtime)
+                if not self.collectable(path, cutoff) or blob_storage.has_working_copy(blob.sha256):
+                    continue
+                blob_storage.delete(blob_name(blob.sha256))
+            freed += blob.size
+            deleted += 1
+
+        # Files on disk without a Blob row (e.g. uploads whose row was never created)
+        root = blob_storage.path(BLOB_PREFIX)
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                if filename in known or filename in copied or not self.collectable(path, cutoff):
+                    continue
+                if self.referenced(filename) or blob_storage.has_working_copy(filename):
+                    continue
+                freed += os.path.getsize(path)
+                deleted += 1
+                if not options['dry_run']:
+                    os.remove(path)
+
+        verb = "Would delete" if options['dry_run'] else "Deleted"
+        self.stdout.write(f"{verb} {deleted} blob(s), {freed} bytes")
+
+    @staticmethod
+    def collectable(path, cutoff):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return True
+        return stat.st_nlink <= 1 and stat.st_mtime < cutoff
+
+    @staticmethod
+    def referenced(sha256):
+        # A row may have been created since the Blob scan
+        return (
+            any(model.objects.filter(sha256=sha256).exists() for model in (UserFile, File))
+            or BehaviorReport.objects.filter(content_hash=sha256).exists()
+        )
+
+    def recount(self):
+        counts = {}
+        for model in (UserFile, File):
+            rows = model.objects.exclude(sha256="").values('sha256').annotate(refs=Count('id'))
+            for row in rows:
+                counts[row['sha256']] = counts.get(row['sha256'], 0) + row['refs']
+        for row in BehaviorReport.objects.values('content_hash').annotate(refs=Count('id')):
+            counts[row['content_hash']] = counts.get(row['content_hash'], 0) + row['refs']
+
+        for blob in Blob.objects.iterator():
+            refs = counts.pop(blob.sha256, 0)
+            if blob.ref_count != refs:
+                Blob.objects.filter(pk=blob.pk).update(ref_count=refs)
+        for sha256, refs in counts.items():
+            name = blob_name(sha256)
+            if blob_storage.exists(name):
+                Blob.objects.get_or_create(sha256=sha256, defaults={'size': blob_storage.size(name), 'ref_count': refs})
+        self.stdout.write("Reference counts recomputed")
+
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('files', '0003_file_owner'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='file',
+            name='ssdeep',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=128),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('files', '0005_blob_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blob',
+            name='copies',
+            field=models.IntegerField(default=0),
+        ),
+    ]
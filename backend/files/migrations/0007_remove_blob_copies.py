@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:26
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('files', '0006_blob_copies'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='blob',
+            name='copies',
+        ),
+    ]
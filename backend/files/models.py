@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from .storage import get_blob_storage
 
 class File(models.Model):
     owner = models.ForeignKey(
@@ -7,7 +8,20 @@ class File(models.Model):
     )  # allow empty owner
     name = models.CharField(max_length=255)
     uploaded_at = models.DateTimeField(auto_now_add=True)
-    file = models.FileField(upload_to="uploads/")
+    file = models.FileField(upload_to="uploads/", storage=get_blob_storage)
+    sha256 = models.CharField(max_length=64, blank=True, default="", db_index=True)  # content blob
+    ssdeep = models.CharField(max_length=128, blank=True, default="", db_index=True)  # fuzzy hash
 
     def __str__(self):
         return self.name
+
+
+# One stored blob (see storage.py); ref_count = UserFile/File rows pointing at it
+class Blob(models.Model):
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    size = models.BigIntegerField(default=0)
+    ref_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.sha256} ({self.ref_count} refs)"
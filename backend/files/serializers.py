@@ -5,3 +5,4 @@ class FileSerializer(serializers.ModelSerializer):
     class Meta:
         model = File
         fields = "__all__"
+        read_only_fields = ["sha256", "ssdeep"]
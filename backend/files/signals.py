@@ -0,0 +1,70 @@
+from collections import Counter, defaultdict
+
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from advanced_mode.models import BehaviorReport
+from users.history import files_recorded
+from users.models import UserFile
+from .models import Blob, File
+from .storage import blob_name, blob_sha256, blob_storage
+
+
+def add_reference(sha256, name):
+    # Increment first: a row is never left at zero references, where collect_blobs could delete it
+    if not Blob.objects.filter(pk=sha256).update(ref_count=F('ref_count') + 1):
+        blob, created = Blob.objects.get_or_create(
+            sha256=sha256, defaults={'size': blob_storage.size(name), 'ref_count': 1},
+        )
+        if not created:
+            Blob.objects.filter(pk=sha256).update(ref_count=F('ref_count') + 1)
+
+
+@receiver(post_save, sender=UserFile)
+@receiver(post_save, sender=File)
+def add_blob_reference(sender, instance, created, **kwargs):
+    """Record the content hash of a new row and count its reference to the blob"""
+    if not created:
+        return
+    sha256 = instance.sha256 or blob_sha256(instance.file.name)
+    if not sha256:
+        return  # Stored outside the blob storage
+    if not instance.sha256:
+        sender.objects.filter(pk=instance.pk).update(sha256=sha256)
+        instance.sha256 = sha256
+    add_reference(sha256, instance.file.name)
+
+
+@receiver(post_save, sender=BehaviorReport)
+def add_report_reference(sender, instance, created, **kwargs):
+    """Reports are downloaded from their blob: keep it while the report exists"""
+    name = blob_name(instance.content_hash)
+    if created and blob_storage.exists(name):
+        add_reference(instance.content_hash, name)
+
+
+@receiver(files_recorded)
+def add_blob_references(sender, instances, **kwargs):
+    """Batch version of add_blob_reference: one UPDATE per distinct count, not per row"""
+    refs = Counter(instance.sha256 for instance in instances if instance.sha256)
+    if not refs:
+        return
+    sizes = {instance.sha256: instance.size for instance in instances}
+    Blob.objects.bulk_create([Blob(sha256=sha256, size=sizes[sha256]) for sha256 in refs], ignore_conflicts=True)
+
+    by_count = defaultdict(list)
+    for sha256, count in refs.items():
+        by_count[count].append(sha256)
+    for count, hashes in by_count.items():
+        Blob.objects.filter(sha256__in=hashes).update(ref_count=F('ref_count') + count)
+
+
+@receiver(post_delete, sender=UserFile)
+@receiver(post_delete, sender=File)
+@receiver(post_delete, sender=BehaviorReport)
+def drop_blob_reference(sender, instance, **kwargs):
+    """The blob itself is removed later by `manage.py collect_blobs`"""
+    sha256 = instance.content_hash if sender is BehaviorReport else instance.sha256
+    if sha256:
+        Blob.objects.filter(sha256=sha256).update(ref_count=F('ref_count') - 1)
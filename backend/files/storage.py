@@ -0,0 +1,122 @@
+import glob
+import hashlib
+import os
+import shutil
+import uuid
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+
+from backend.metrics import timed
+
+BLOB_PREFIX = "blobs"
+
+# link() destinations: advanced/<use>/<sha256>/<name>
+WORKING_COPY_PREFIX = "advanced"
+
+
+def blob_name(sha256):
+    """blobs/ab/cd/abcd... : two directory levels keep folders small"""
+    return f"{BLOB_PREFIX}/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+def blob_sha256(name):
+    """SHA-256 of a stored blob from its name ('' for files stored before blobs)"""
+    if not name or not name.startswith(BLOB_PREFIX + "/"):
+        return ""
+    return name.rsplit("/", 1)[-1]
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores every file under MEDIA_ROOT/blobs/, named by the SHA-256 of its
+    content. Saving content that is already stored only returns the
+    existing name, so duplicate uploads cost no disk space or copy.
+    Original file names are kept on the models, not on disk.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # Same name means same content: never suffix, overwriting is harmless
+        return name
+
+    @timed("upload_write")
+    def _save(self, name, content):
+        sha256 = getattr(content, 'sha256', None) or self._hash(content)
+        name = blob_name(sha256)
+        full_path = self.path(name)
+
+        if os.path.exists(full_path):
+            os.utime(full_path)  # Marks the blob as in use for collect_blobs
+            return name
+
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        if hasattr(content, 'temporary_file_path'):
+            file_move_safe(content.temporary_file_path(), full_path, allow_overwrite=True)
+        else:
+            # Write next to the blob, then rename: readers never see a partial blob
+            tmp_path = f"{full_path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, 'wb') as f:
+                for chunk in content.chunks():
+                    f.write(chunk)
+            os.replace(tmp_path, full_path)
+
+        if self.file_permissions_mode is not None:
+            os.chmod(full_path, self.file_permissions_mode)
+        return name
+
+    def link(self, name, destination):
+        """
+        Expose blob `name` at `destination` (relative to MEDIA_ROOT) through a
+        hard link, or a copy where links aren't supported. Returns the full path.
+        """
+        source, target = self.path(name), self.path(destination)
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            try:
+                os.link(source, target)
+            except FileExistsError:
+                pass
+            except OSError:
+                shutil.copyfile(source, target)
+        return target
+
+    def working_copies(self):
+        """
+        SHA-256 of every blob that has a working copy (hard link or copy,
+        see link()) under WORKING_COPY_PREFIX. Read from the directories
+        themselves: deleting the copies is all it takes to release a blob.
+        """
+        found = set()
+        root = self.path(WORKING_COPY_PREFIX)
+        if not os.path.isdir(root):
+            return found
+        for use in os.scandir(root):
+            if not use.is_dir():
+                continue
+            for entry in os.scandir(use.path):
+                if entry.is_dir() and any(os.scandir(entry.path)):
+                    found.add(entry.name)
+        return found
+
+    def has_working_copy(self, sha256):
+        root = self.path(WORKING_COPY_PREFIX)
+        return any(
+            os.path.isdir(directory) and os.listdir(directory)
+            for directory in glob.glob(os.path.join(glob.escape(root), '*', sha256))
+        )
+
+    @staticmethod
+    def _hash(content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        return digest.hexdigest()
+
+
+blob_storage = ContentAddressedStorage()
+
+
+def get_blob_storage():
+    # Callable so migrations reference the function, not a serialized instance
+    return blob_storage
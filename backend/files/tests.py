@@ -1,3 +1,184 @@
-from django.test import TestCase
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db.models import F
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from advanced_mode.models import BehaviorReport
+from .downloads import RangeNotSatisfiable, file_response, parse_range
+from .management.commands.collect_blobs import Command
+from .models import Blob
+from .storage import blob_name, blob_storage
+
+
+class ParseRangeTests(SimpleTestCase):
+    def test_closed_range(self):
+        self.assertEqual(parse_range('bytes=10-19', 100), (10, 19))
+
+    def test_end_is_clamped_to_the_file(self):
+        self.assertEqual(parse_range('bytes=90-200', 100), (90, 99))
+
+    def test_open_ended_range(self):
+        self.assertEqual(parse_range('bytes=95-', 100), (95, 99))
+
+    def test_suffix_range(self):
+        self.assertEqual(parse_range('bytes=-5', 100), (95, 99))
+        self.assertEqual(parse_range('bytes=-500', 100), (0, 99))
+
+    def test_ignored_ranges(self):
+        for header in (None, '', 'items=0-1', 'bytes=0-1,5-6', 'bytes=5-2', 'bytes=a-b', 'bytes=-', 'bytes=1'):
+            with self.subTest(header=header):
+                self.assertIsNone(parse_range(header, 100))
+
+    def test_non_ascii_digits_are_ignored(self):
+        # WSGI passes latin-1 header bytes through: '²' isdigit() but int() rejects it
+        self.assertIsNone(parse_range('bytes=\xb2-', 10))
+        self.assertIsNone(parse_range('bytes=0-\xb9', 10))
+
+    def test_unsatisfiable_ranges(self):
+        for header, size in (('bytes=100-', 100), ('bytes=100-200', 100), ('bytes=-0', 100), ('bytes=-5', 0)):
+            with self.subTest(header=header, size=size):
+                with self.assertRaises(RangeNotSatisfiable):
+                    parse_range(header, size)
+
+
+class FileResponseTests(TestCase):
+    content = bytes(range(256)) * 4
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media = override_settings(MEDIA_ROOT=self.media_root, FILE_DOWNLOADS={'MODE': 'stream'})
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.name = blob_storage.save('sample.bin', ContentFile(self.content))
+        self.sha256 = hashlib.sha256(self.content).hexdigest()
+        self.etag = f'"{self.sha256}"'
+        self.factory = RequestFactory()
+
+    def get(self, **headers):
+        return file_response(self.factory.get('/', headers=headers), self.name, 'sample.bin', self.sha256)
+
+    def test_whole_file(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['ETag'], self.etag)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="sample.bin"')
+        response.close()
+
+    def test_if_none_match(self):
+        self.assertEqual(self.get(if_none_match=self.etag).status_code, 304)
+
+    def test_range(self):
+        response = self.get(range='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.content)}')
+        self.assertEqual(response['Content-Length'], '10')
+        self.assertEqual(b''.join(response.streaming_content), self.content[10:20])
+
+    def test_unsatisfiable_range(self):
+        response = self.get(range=f'bytes={len(self.content)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.content)}')
+
+    def test_if_range(self):
+        self.assertEqual(self.get(range='bytes=0-1', if_range=self.etag).status_code, 206)
+        response = self.get(range='bytes=0-1', if_range='"other"')
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+    @override_settings(FILE_DOWNLOADS={'MODE': 'x-accel-redirect', 'ACCEL_REDIRECT_LOCATION': '/protected/'})
+    def test_accel_redirect(self):
+        response = self.get()
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected/{self.name}')
+        self.assertEqual(response.content, b'')
+
+
+class ReportBlobReferenceTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.owner = User.objects.create_user('owner', 'owner@example.com', 'password')
+
+    def test_report_holds_a_reference_to_its_blob(self):
+        name = blob_storage.save('report.csv', ContentFile(b'report'))
+        sha256 = hashlib.sha256(b'report').hexdigest()
+        self.assertEqual(name, blob_name(sha256))
+
+        report = BehaviorReport.objects.create(owner=self.owner, name='report.csv', content_hash=sha256, signature_ids=b'')
+        self.assertEqual(Blob.objects.get(sha256=sha256).ref_count, 1)
+        report.delete()
+        self.assertEqual(Blob.objects.get(sha256=sha256).ref_count, 0)
+
+
+class CollectBlobsTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def store(self, content):
+        name = blob_storage.save('sample.bin', ContentFile(content))
+        Blob.objects.create(sha256=hashlib.sha256(content).hexdigest(), size=len(content))
+        return name
+
+    def age(self, name):
+        # Older than the default grace period
+        path = blob_storage.path(name)
+        os.utime(path, (time.time() - 7200,) * 2)
+        return path
+
+    def collect(self):
+        call_command('collect_blobs', stdout=io.StringIO())
+
+    def test_unreferenced_blob_is_collected(self):
+        path = self.age(self.store(b'unused'))
+        self.collect()
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(Blob.objects.exists())
+
+    def test_copied_working_copy_keeps_blob_until_removed(self):
+        name = self.store(b'copied')
+        sha256 = hashlib.sha256(b'copied').hexdigest()
+        with mock.patch('os.link', side_effect=OSError):  # Filesystem without hard links
+            copy = blob_storage.link(name, os.path.join('advanced', 'reports', sha256, 'report.csv'))
+        path = self.age(name)
+
+        self.collect()
+        self.assertTrue(os.path.exists(path))
+
+        shutil.rmtree(os.path.dirname(copy))
+        self.collect()
+        self.assertFalse(os.path.exists(path))
+
+    def test_blob_referenced_after_the_scan_is_kept(self):
+        name = self.store(b'reused')
+        sha256 = hashlib.sha256(b'reused').hexdigest()
+        path = self.age(name)
+        original = Command.collectable
+
+        def collectable(path, cutoff):
+            # An upload of the same content lands between the scan and the delete
+            Blob.objects.filter(sha256=sha256).update(ref_count=F('ref_count') + 1)
+            return original(path, cutoff)
+
+        with mock.patch.object(Command, 'collectable', staticmethod(collectable)):
+            self.collect()
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(Blob.objects.get(sha256=sha256).ref_count, 1)
@@ -0,0 +1,67 @@
+import hashlib
+import os
+import time
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+
+from advanced_mode.utils.core.comparator import get_ssdeep
+from backend.metrics import observe_stage
+
+
+class HashedUploadedFile(TemporaryUploadedFile):
+    """
+    Upload streamed to a temporary file under MEDIA_ROOT, with its digests.
+    Storing it is a rename (same filesystem), never a second copy.
+    """
+
+    md5 = ""
+    sha256 = ""
+    ssdeep = ""
+
+
+class HashingFileUploadHandler(FileUploadHandler):
+    """
+    Writes every upload chunk to disk and feeds the same chunk to MD5,
+    SHA-256 and (when available) ssdeep, so no one has to read the file
+    back afterwards. Memory use does not depend on the file size.
+    Time spent writing and hashing is summed per file and recorded once
+    as the upload_write and hashing stages (backend.metrics).
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        os.makedirs(settings.FILE_UPLOAD_TEMP_DIR, exist_ok=True)
+        self.file = HashedUploadedFile(self.file_name, self.content_type, 0, self.charset, self.content_type_extra)
+        self.md5 = hashlib.md5()
+        self.sha256 = hashlib.sha256()
+        ssdeep = get_ssdeep()  # Imported by the first upload, not at startup
+        self.fuzzy = ssdeep.Hash() if ssdeep is not None and hasattr(ssdeep, 'Hash') else None
+        self.write_seconds = self.hash_seconds = 0.0
+
+    def receive_data_chunk(self, raw_data, start):
+        started = time.perf_counter()
+        self.file.write(raw_data)
+        written = time.perf_counter()
+        self.md5.update(raw_data)
+        self.sha256.update(raw_data)
+        if self.fuzzy is not None:
+            self.fuzzy.update(raw_data)
+        self.write_seconds += written - started
+        self.hash_seconds += time.perf_counter() - written
+
+    def file_complete(self, file_size):
+        self.file.seek(0)
+        self.file.size = file_size
+        self.file.md5 = self.md5.hexdigest()
+        self.file.sha256 = self.sha256.hexdigest()
+        self.file.ssdeep = self.fuzzy.digest() if self.fuzzy is not None else ""
+        observe_stage("upload_write", self.write_seconds)
+        observe_stage("hashing", self.hash_seconds)
+        return self.file
+
+    def upload_interrupted(self):
+        if hasattr(self, 'file'):
+            self.file.close()  # Also removes the temporary file
+
@@ -9,4 +9,5 @@ class FileListCreateAPIView(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticatedOrReadOnly]
 
     def perform_create(self, serializer):
-        serializer.save(owner=self.request.user)
+        upload = serializer.validated_data.get('file')
+        serializer.save(owner=self.request.user, ssdeep=getattr(upload, 'ssdeep', '') or '')
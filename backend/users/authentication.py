@@ -0,0 +1,133 @@
+"""Token authentication with the token -> user lookup cached between requests"""
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+from backend.metrics import Counter, registry
+
+DEFAULT_TTL = 60
+DEFAULT_MAX_ENTRIES = 10000
+
+LOOKUPS = registry.register(Counter(
+    "shapeshifter_token_auth_lookups", "Token authentications by cache outcome.", ("result",),
+))
+
+
+class TokenCache:
+    """
+    (user, token) per token key: an in-process LRU tier with a TTL, and an
+    optional shared tier (a Django cache alias, e.g. file-based or memcached)
+    so workers on the same host don't each go to the database.
+
+    signals.py invalidates entries when a token is deleted or saved (logout,
+    rotation) and when its user is saved (deactivation, permission changes).
+    Other processes' in-process entries can't be reached by those signals:
+    they expire after `ttl` seconds, which bounds how long a revoked token
+    keeps working there.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 shared_cache: Optional[str] = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.shared_cache = shared_cache
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _shared_key(key: str) -> str:
+        # Never use the raw token as a key outside the process
+        return "token-auth:" + hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[object, object]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    LOOKUPS.inc(result="memory")
+                    return value
+                del self._memory[key]
+
+        if self.shared_cache:
+            value = caches[self.shared_cache].get(self._shared_key(key))
+            if value is not None:
+                self._remember(key, value, now)
+                LOOKUPS.inc(result="shared")
+                return value
+
+        LOOKUPS.inc(result="miss")
+        return None
+
+    def set(self, key: str, value: Tuple[object, object]):
+        self._remember(key, value, time.monotonic())
+        if self.shared_cache:
+            caches[self.shared_cache].set(self._shared_key(key), value, timeout=self.ttl)
+
+    def invalidate(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._memory.pop(key, None)
+        if self.shared_cache and keys:
+            caches[self.shared_cache].delete_many([self._shared_key(key) for key in keys])
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+
+    def _remember(self, key, value, now):
+        with self._lock:
+            self._memory[key] = (now + self.ttl, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_token_cache() -> TokenCache:
+    """Process-wide cache configured from settings.TOKEN_AUTH_CACHE"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            options = getattr(settings, 'TOKEN_AUTH_CACHE', {})
+            _cache = TokenCache(
+                ttl=options.get('TTL', DEFAULT_TTL),
+                max_entries=options.get('MAX_ENTRIES', DEFAULT_MAX_ENTRIES),
+                shared_cache=options.get('SHARED_CACHE'),
+            )
+        return _cache
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication (same `Authorization: Token <key>` header) that
+    serves repeated requests from TokenCache: a cache hit costs no query.
+    """
+
+    def authenticate_credentials(self, key):
+        cache = get_token_cache()
+        cached = cache.get(key)
+        if cached is None:
+            user, token = super().authenticate_credentials(key)
+            cache.set(key, (user, token))
+        else:
+            user, token = cached
+            if not user.is_active:
+                raise exceptions.AuthenticationFailed('User inactive or deleted.')
+        # Each request gets its own instances: views may modify request.user
+        user, token = copy.copy(user), copy.copy(token)
+        token.user = user
+        return user, token
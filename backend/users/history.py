@@ -0,0 +1,39 @@
+"""Bulk recording of UserFile history rows"""
+from typing import Iterable, List
+
+from django.db import transaction
+from django.dispatch import Signal
+
+from files.storage import blob_sha256
+from .models import UserFile
+
+BATCH_SIZE = 500
+
+# Sent once per record_files() call with the inserted rows, inside its
+# transaction (bulk_create sends no post_save). Receivers do for the whole
+# batch what their post_save handler does for one row: file counter
+# (users), blob references (files), fuzzy index (advanced_mode). Keep the
+# work done inside the transaction to short UPDATEs; slow work (file I/O)
+# belongs in transaction.on_commit.
+files_recorded = Signal()
+
+
+def record_files(user_files: Iterable[UserFile], batch_size: int = BATCH_SIZE) -> List[UserFile]:
+    """
+    Insert unsaved UserFile rows with bulk_create, in one transaction, and
+    return them with their ids. Size and content hash are filled in first,
+    as the per-row signals would.
+    """
+    user_files = list(user_files)
+    if not user_files:
+        return user_files
+    for user_file in user_files:
+        if not user_file.size and user_file.file:
+            user_file.size = user_file.file.size
+        if not user_file.sha256:
+            user_file.sha256 = blob_sha256(user_file.file.name)
+
+    with transaction.atomic():
+        UserFile.objects.bulk_create(user_files, batch_size=batch_size)
+        files_recorded.send(sender=UserFile, instances=user_files)
+    return user_files
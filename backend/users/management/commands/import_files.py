@@ -0,0 +1,55 @@
+import os
+
+from django.contrib.auth.models import User
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+
+from files.storage import blob_storage
+from users.history import BATCH_SIZE, record_files
+from users.models import UserFile
+
+
+class Command(BaseCommand):
+    help = (
+        "Import files (or every file under directories) into a user's history. "
+        "Contents are stored once in the blob storage and rows are inserted in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('paths', nargs='+', help="Files or directories (walked recursively)")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                            help=f"Rows per transaction (default: {BATCH_SIZE})")
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options['username']).first()
+        if user is None:
+            raise CommandError(f"Unknown user: {options['username']}")
+
+        batch, imported = [], 0
+        for path in self.walk(options['paths']):
+            batch.append(self.store(user, path))
+            if len(batch) >= options['batch_size']:
+                imported += len(record_files(batch, batch_size=options['batch_size']))
+                batch = []
+        imported += len(record_files(batch, batch_size=options['batch_size']))
+        self.stdout.write(f"Imported {imported} file(s) for {user.username}")
+
+    @staticmethod
+    def walk(paths):
+        for path in paths:
+            if os.path.isdir(path):
+                for directory, _, filenames in os.walk(path):
+                    for filename in sorted(filenames):
+                        yield os.path.join(directory, filename)
+            elif os.path.isfile(path):
+                yield path
+            else:
+                raise CommandError(f"No such file or directory: {path}")
+
+    @staticmethod
+    def store(user, path):
+        name = os.path.basename(path)
+        with open(path, 'rb') as f:
+            blob = blob_storage.save(name, File(f, name=name))
+        return UserFile(user=user, file=blob, original_name=name[:255], size=os.path.getsize(path))
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:50
+
+import files.storage
+from django.db import migrations, models
+
+
+def fill_original_names(apps, schema_editor):
+    UserFile = apps.get_model('users', 'UserFile')
+    for user_file in UserFile.objects.filter(original_name="").only('id', 'file').iterator():
+        user_file.original_name = user_file.file.name.split("/")[-1][:255]
+        user_file.save(update_fields=['original_name'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_userfile_ssdeep'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userfile',
+            name='original_name',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='userfile',
+            name='sha256',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+        migrations.AlterField(
+            model_name='userfile',
+            name='file',
+            field=models.FileField(storage=files.storage.get_blob_storage, upload_to='uploads/'),
+        ),
+        migrations.RunPython(fill_original_names, migrations.RunPython.noop),
+    ]
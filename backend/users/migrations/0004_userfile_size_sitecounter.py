@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_sizes_and_counters(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    UserFile = apps.get_model('users', 'UserFile')
+    SiteCounter = apps.get_model('users', 'SiteCounter')
+
+    # One last stat per existing file; new rows get their size at upload
+    for user_file in UserFile.objects.filter(size=0).only('id', 'file').iterator():
+        try:
+            size = user_file.file.size
+        except (OSError, ValueError):
+            continue
+        UserFile.objects.filter(pk=user_file.pk).update(size=size)
+
+    SiteCounter.objects.update_or_create(name='users', defaults={'value': User.objects.count()})
+    SiteCounter.objects.update_or_create(name='files', defaults={'value': UserFile.objects.count()})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_userfile_blob_storage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SiteCounter',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='userfile',
+            name='size',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='userfile',
+            index=models.Index(fields=['-uploaded_at', '-id'], name='userfile_recent'),
+        ),
+        migrations.RunPython(fill_sizes_and_counters, migrations.RunPython.noop),
+    ]
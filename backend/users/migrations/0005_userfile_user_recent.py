@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_userfile_size_sitecounter'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userfile',
+            index=models.Index(fields=['user', '-uploaded_at', '-id'], name='userfile_user_recent'),
+        ),
+    ]
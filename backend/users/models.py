@@ -1,17 +1,51 @@
 from django.db import models
 from django.contrib.auth.models import User
+from files.storage import get_blob_storage
 
 # This class defines what each uploaded file will look like in the database
 class UserFile(models.Model):
     # Link the file to the user who uploaded it
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="files")
     
-    # The actual file (Django will store it inside a folder in your project)
-    file = models.FileField(upload_to="uploads/")
+    # The actual file, stored once per content under media/blobs/ (files.storage)
+    file = models.FileField(upload_to="uploads/", storage=get_blob_storage)
+
+    # Name of the file as uploaded, and the SHA-256 of its content
+    original_name = models.CharField(max_length=255, blank=True, default="")
+    sha256 = models.CharField(max_length=64, blank=True, default="", db_index=True)
     
     # Automatically save the time when the file was uploaded
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
+    # ssdeep fuzzy hash, computed once when the file is stored
+    ssdeep = models.CharField(max_length=128, blank=True, default="", db_index=True)
+
+    # Size in bytes, recorded at upload so listings never stat the file
+    size = models.BigIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # Admin listing: keyset pagination on (uploaded_at, id)
+            models.Index(fields=['-uploaded_at', '-id'], name='userfile_recent'),
+            # A user's files, newest first: recent_uploads, UserFileUploadView
+            models.Index(fields=['user', '-uploaded_at', '-id'], name='userfile_user_recent'),
+        ]
+
     def __str__(self):
         # Just a readable name for admin panel or debugging
         return f"{self.user.username} - {self.file.name}"
+
+
+# Global counters kept up to date by signals (see signals.py), read by get_stats
+class SiteCounter(models.Model):
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    @classmethod
+    def add(cls, name, delta):
+        if not cls.objects.filter(name=name).update(value=models.F('value') + delta):
+            cls.objects.get_or_create(name=name)
+            cls.objects.filter(name=name).update(value=models.F('value') + delta)
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
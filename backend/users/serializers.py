@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
+from django.urls import reverse
 from .models import UserFile   
 
 
@@ -36,8 +37,15 @@ class LoginSerializer(serializers.Serializer):
             return user
         raise serializers.ValidationError("Incorrect Credentials")
 
-# File upload serializer
+# File upload serializer: the stored file is only served by the download endpoint
 class UserFileSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
     class Meta:
         model = UserFile
-        fields = ['id', 'file', 'uploaded_at']
\ No newline at end of file
+        fields = ['id', 'file', 'download_url', 'original_name', 'uploaded_at', 'sha256', 'ssdeep']
+        read_only_fields = ['original_name', 'sha256', 'ssdeep']
+        extra_kwargs = {'file': {'write_only': True}}
+
+    def get_download_url(self, obj):
+        return reverse('file_download', args=[obj.pk])
\ No newline at end of file
@@ -0,0 +1,48 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import get_token_cache
+from .history import files_recorded
+from .models import SiteCounter, UserFile
+
+
+@receiver(pre_save, sender=UserFile)
+def record_size(sender, instance, **kwargs):
+    # For a fresh upload this is the upload's size, not a filesystem stat
+    if instance._state.adding and not instance.size and instance.file:
+        instance.size = instance.file.size
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=UserFile)
+def count_created(sender, instance, created, **kwargs):
+    if created:
+        SiteCounter.add('users' if sender is User else 'files', 1)
+
+
+@receiver(files_recorded)
+def count_recorded(sender, instances, **kwargs):
+    SiteCounter.add('files', len(instances))
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=UserFile)
+def count_deleted(sender, instance, **kwargs):
+    SiteCounter.add('users' if sender is User else 'files', -1)
+
+
+# Token authentication cache (authentication.py): logout and rotation delete
+# or replace the token; saving a user (deactivation, permission changes)
+# drops every cached token of that user.
+@receiver(post_delete, sender=Token)
+@receiver(post_save, sender=Token)
+def invalidate_token(sender, instance, **kwargs):
+    get_token_cache().invalidate(instance.key)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_tokens(sender, instance, created, **kwargs):
+    if not created:
+        get_token_cache().invalidate(*Token.objects.filter(user=instance).values_list('key', flat=True))
@@ -1,3 +1,161 @@
-from django.test import TestCase
+import hashlib
+import io
+import os
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import exceptions
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from files.models import Blob
+from files.storage import blob_storage
+from .authentication import CachedTokenAuthentication, get_token_cache
+from .history import files_recorded, record_files
+from .models import SiteCounter, UserFile
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        get_token_cache().clear()
+        self.addCleanup(get_token_cache().clear)
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+        self.token = Token.objects.create(user=self.user)
+
+    def client_for(self, key):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {key}')
+        return client
+
+    def test_cache_hit_costs_no_query(self):
+        authentication = CachedTokenAuthentication()
+        user, token = authentication.authenticate_credentials(self.token.key)
+        with self.assertNumQueries(0):
+            cached_user, cached_token = authentication.authenticate_credentials(self.token.key)
+        self.assertEqual(cached_user.pk, self.user.pk)
+        self.assertEqual(cached_token.key, self.token.key)
+        # Each request gets its own copies
+        self.assertIsNot(cached_user, user)
+
+    def test_unknown_token(self):
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            CachedTokenAuthentication().authenticate_credentials('0' * 40)
+
+    def test_logout_revokes_cached_token(self):
+        client = self.client_for(self.token.key)
+        self.assertEqual(client.get('/api/users/me/').status_code, 200)
+        self.assertEqual(client.post('/api/users/logout/').status_code, 204)
+        self.assertEqual(client.get('/api/users/me/').status_code, 401)
+
+    def test_rotation_revokes_cached_token(self):
+        client = self.client_for(self.token.key)
+        self.assertEqual(client.get('/api/users/me/').status_code, 200)
+        response = client.post('/api/users/token/rotate/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(client.get('/api/users/me/').status_code, 401)
+        self.assertEqual(self.client_for(response.data['token']).get('/api/users/me/').status_code, 200)
+
+    def test_deactivation_revokes_cached_token(self):
+        client = self.client_for(self.token.key)
+        self.assertEqual(client.get('/api/users/me/').status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(client.get('/api/users/me/').status_code, 401)
+
+    def test_user_changes_are_not_served_stale(self):
+        client = self.client_for(self.token.key)
+        self.assertFalse(client.get('/api/users/me/').data['is_admin'])
+        self.user.is_staff = True
+        self.user.save()
+        self.assertTrue(client.get('/api/users/me/').data['is_admin'])
+
+    def test_token_deleted_directly_is_revoked(self):
+        client = self.client_for(self.token.key)
+        self.assertEqual(client.get('/api/users/me/').status_code, 200)
+        self.token.delete()
+        self.assertEqual(client.get('/api/users/me/').status_code, 401)
+
+
+class RecordFilesTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+
+    def receive(self):
+        batches = []
+
+        def receiver(sender, instances, **kwargs):
+            batches.append(len(instances))
+
+        files_recorded.connect(receiver)
+        self.addCleanup(files_recorded.disconnect, receiver)
+        return batches
+
+    def test_one_signal_and_one_insert_per_batch(self):
+        names = [blob_storage.save('sample.bin', ContentFile(b'sample %d' % (i % 3))) for i in range(10)]
+        batches = self.receive()
+
+        with CaptureQueriesContext(connection) as queries:
+            recorded = record_files([UserFile(user=self.user, file=name, original_name='sample.bin') for name in names])
+
+        self.assertEqual(batches, [10])
+        inserts = [q['sql'] for q in queries if q['sql'].startswith('INSERT INTO "users_userfile"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertTrue(all(user_file.pk for user_file in recorded))
+        self.assertEqual(SiteCounter.objects.get(name='files').value, 10)
+        refs = {blob.sha256: blob.ref_count for blob in Blob.objects.all()}
+        self.assertEqual(refs, {hashlib.sha256(b'sample %d' % i).hexdigest(): count for i, count in ((0, 4), (1, 3), (2, 3))})
+
+    def test_import_command(self):
+        source = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, source)
+        for i in range(5):
+            with open(os.path.join(source, f'sample{i}.exe'), 'wb') as f:
+                f.write(b'sample %d' % i)
+        batches = self.receive()
+
+        call_command('import_files', 'alice', source, batch_size=2, stdout=io.StringIO())
+
+        self.assertEqual(batches, [2, 2, 1])
+        self.assertEqual(
+            sorted(UserFile.objects.filter(user=self.user).values_list('original_name', flat=True)),
+            [f'sample{i}.exe' for i in range(5)],
+        )
+        self.assertEqual(SiteCounter.objects.get(name='files').value, 5)
+        self.assertEqual(Blob.objects.filter(ref_count=1).count(), 5)
+
+
+class UploadDownloadTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media = override_settings(MEDIA_ROOT=self.media_root, FILE_DOWNLOADS={'MODE': 'stream'})
+        media.enable()
+        self.addCleanup(media.disable)
+        self.owner = APIClient()
+        self.owner.force_authenticate(User.objects.create_user('alice', 'alice@example.com', 'password'))
+        self.other = APIClient()
+        self.other.force_authenticate(User.objects.create_user('bob', 'bob@example.com', 'password'))
+
+    def test_serialized_url_is_served_to_the_owner_only(self):
+        response = self.owner.post('/api/users/upload/', {'file': SimpleUploadedFile('sample.exe', b'MZ sample')})
+        self.assertEqual(response.status_code, 201)
+        url = response.data['download_url']
+        self.assertNotIn('file', response.data)
+        self.assertEqual(self.owner.get('/api/users/upload/').data[0]['download_url'], url)
+
+        download = self.owner.get(url)
+        self.assertEqual(download.status_code, 200)
+        self.assertEqual(b''.join(download.streaming_content), b'MZ sample')
+        self.assertEqual(self.other.get(url).status_code, 404)
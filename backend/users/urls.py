@@ -14,6 +14,8 @@ from . import views
 urlpatterns = [
     path('register/', RegisterAPI.as_view(), name='register'),
     path('login/', LoginAPI.as_view(), name='login'),
+    path('logout/', views.LogoutAPI.as_view(), name='logout'),
+    path('token/rotate/', views.TokenRotateAPI.as_view(), name='token-rotate'),
     path('google-login/', GoogleLoginView.as_view(), name='google-login'), # ✅ New Google Auth Route
     path('upload/', UserFileUploadView.as_view(), name='file-upload'),  
 
@@ -23,5 +25,6 @@ urlpatterns = [
     path("storage/", views.storage_usage, name="storage_usage"),
     path('stats/', get_stats, name='get_stats'),
     path('files/admin/', views.admin_files, name='admin_files'),
+    path('files/<int:pk>/download/', views.download_file, name='file_download'),
 
 ]
@@ -1,3 +1,5 @@
+import logging
+from django.db import transaction
 from rest_framework import generics, permissions
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
@@ -5,6 +7,8 @@ from .serializers import UserSerializer, RegisterSerializer, LoginSerializer
 from .models import UserFile
 from .serializers import UserFileSerializer
 
+logger = logging.getLogger(__name__)
+
 
 class RegisterAPI(generics.GenericAPIView):
     serializer_class = RegisterSerializer
@@ -26,6 +30,24 @@ class LoginAPI(generics.GenericAPIView):
         token, _ = Token.objects.get_or_create(user=user)
         return Response({"user": UserSerializer(user).data, "token": token.key})
 
+# Deleting or replacing the token also evicts it from the authentication
+# cache (signals.py), so the old key stops working right away
+class LogoutAPI(generics.GenericAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        Token.objects.filter(key=request.auth.key).delete()
+        return Response(status=204)
+
+class TokenRotateAPI(generics.GenericAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        with transaction.atomic():
+            Token.objects.filter(key=request.auth.key).delete()
+            token = Token.objects.create(user=request.user)
+        return Response({"token": token.key})
+
 # File upload
 class UserFileUploadView(generics.ListCreateAPIView):
     serializer_class = UserFileSerializer
@@ -33,17 +55,31 @@ class UserFileUploadView(generics.ListCreateAPIView):
 
     # This method controls which files the user can see (only their own)
     def get_queryset(self):
-        return UserFile.objects.filter(user=self.request.user)
+        return UserFile.objects.filter(user=self.request.user).order_by('-uploaded_at', '-id')
 
     # This method automatically attaches the current user when saving a new file
+    # (and the fuzzy hash computed while the upload was streamed to disk)
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        upload = serializer.validated_data.get('file')
+        serializer.save(
+            user=self.request.user,
+            original_name=upload.name[:255],
+            ssdeep=getattr(upload, 'ssdeep', '') or '',
+        )
 
 
+import base64
+import binascii
+from datetime import datetime
+from django.db.models import Count, Q, Sum
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
-from .models import UserFile
+from .models import SiteCounter, UserFile
 from rest_framework.response import Response
+from files.downloads import file_response
 
 
 
@@ -65,11 +101,15 @@ def user_profile(request):
 @permission_classes([IsAuthenticated])
 def recent_uploads(request):
     """Return last 5 uploaded files for the logged-in user"""
-    files = UserFile.objects.filter(user=request.user).order_by("-uploaded_at")[:5]
+    files = (
+        UserFile.objects.filter(user=request.user)
+        .only("file", "original_name", "size", "uploaded_at")
+        .order_by("-uploaded_at")[:5]
+    )
     data = [
         {
-            "name": f.file.name.split("/")[-1],
-            "size": f.file.size,
+            "name": f.original_name or f.file.name.split("/")[-1],
+            "size": f.size,
             "date": f.uploaded_at.strftime("%Y-%m-%d %H:%M"),
         }
         for f in files
@@ -81,15 +121,15 @@ def recent_uploads(request):
 @permission_classes([IsAuthenticated])
 def storage_usage(request):
     """Return total storage used + percentage"""
-    files = UserFile.objects.filter(user=request.user)
-    used = sum([f.file.size for f in files])
+    usage = UserFile.objects.filter(user=request.user).aggregate(used=Sum("size"), file_count=Count("id"))
+    used = usage["used"] or 0
     total = 10 * 1024 * 1024 * 1024  # 10 GB total plan
     percent = (used / total) * 100 if total > 0 else 0
     return Response({
         "used": used,
         "total": total,
         "percentage": percent,
-        "file_count": files.count(),
+        "file_count": usage["file_count"],
     })
 
 
@@ -97,43 +137,87 @@ def storage_usage(request):
 @permission_classes([IsAuthenticated])
 def get_stats(request):
     """Return global stats for dashboard"""
-    from django.contrib.auth.models import User
-    from .models import UserFile
-
-    total_users = User.objects.count()
-    total_files = UserFile.objects.count()
+    # Maintained incrementally by signals.py instead of counting whole tables
+    counters = dict(SiteCounter.objects.filter(name__in=["users", "files"]).values_list("name", "value"))
     uptime = 99  # You can replace with dynamic later if you want
 
     return Response({
-        "users": total_users,
-        "files": total_files,
+        "users": counters.get("users", 0),
+        "files": counters.get("files", 0),
         "uptime": uptime,
     })
 
 
+def encode_cursor(user_file):
+    raw = f"{user_file.uploaded_at.isoformat()}|{user_file.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    uploaded_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+    return datetime.fromisoformat(uploaded_at), int(pk)
+
+
 @api_view(["GET"])
 @permission_classes([IsAdminUser])
 def admin_files(request):
-    """Return ALL files for admin dashboard with user info"""
-    files = UserFile.objects.all().order_by("-uploaded_at")
+    """
+    Return ALL files for admin dashboard with user info, newest first.
+    Keyset pagination: ?limit=N (max 500) and ?cursor=<X-Next-Cursor of the previous page>
+    """
+    try:
+        limit = min(max(int(request.query_params.get("limit", 100)), 1), 500)
+    except ValueError:
+        return Response({"error": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+    files = (
+        UserFile.objects.select_related("user")
+        .only("id", "file", "original_name", "uploaded_at", "user__username", "user__email")
+        .order_by("-uploaded_at", "-id")
+    )
+    cursor = request.query_params.get("cursor")
+    if cursor:
+        try:
+            uploaded_at, pk = decode_cursor(cursor)
+        except (ValueError, UnicodeDecodeError, binascii.Error):
+            return Response({"error": "Invalid cursor"}, status=status.HTTP_400_BAD_REQUEST)
+        files = files.filter(Q(uploaded_at__lt=uploaded_at) | Q(uploaded_at=uploaded_at, id__lt=pk))
+
+    page = list(files[:limit + 1])
     data = [
         {
             "id": f.id,
-            "filename": f.file.name.split("/")[-1],
-            "url": f.file.url,
+            "filename": f.original_name or f.file.name.split("/")[-1],
+            "url": reverse("file_download", args=[f.id]),
             "uploaded_at": f.uploaded_at.strftime("%Y-%m-%d %H:%M"),
             "owner_username": f.user.username,
             "owner_email": f.user.email,
         }
-        for f in files
+        for f in page[:limit]
     ]
-    return Response(data)
+    response = Response(data)
+    if len(page) > limit:
+        response["X-Next-Cursor"] = encode_cursor(page[limit - 1])
+    return response
+
+
+@api_view(["GET", "HEAD"])
+@permission_classes([IsAuthenticated])
+def download_file(request, pk):
+    """
+    Stream one of the user's files (any file for staff), with Range and
+    If-None-Match support: see files.downloads.
+    Other users' files answer 404, so their ids can't be probed.
+    """
+    files = UserFile.objects.only("file", "original_name", "sha256")
+    if not request.user.is_staff:
+        files = files.filter(user=request.user)
+    user_file = get_object_or_404(files, pk=pk)
+    filename = user_file.original_name or user_file.file.name.split("/")[-1]
+    return file_response(request, user_file.file.name, filename, user_file.sha256)
 
 
 # Google Auth
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
-import requests # ✅ Import requests for fetching userinfo
 from rest_framework.views import APIView
 from rest_framework import status
 import random
@@ -149,13 +233,13 @@ class GoogleLoginView(APIView):
 
     def post(self, request):
         token_str = request.data.get('token')
-        print(f"DEBUG: Received Google Token (Access Token): {token_str[:20]}...") 
-        
+
         if not token_str:
             return Response({'error': 'No token provided'}, status=status.HTTP_400_BAD_REQUEST)
         
         try:
             # New Logic: Verify Access Token by calling Google UserInfo API
+            import requests  # Only this view needs it: not loaded at worker startup
             user_info_url = "https://www.googleapis.com/oauth2/v3/userinfo"
             response = requests.get(user_info_url, params={'access_token': token_str})
             
@@ -163,7 +247,6 @@ class GoogleLoginView(APIView):
                 raise ValueError("Failed to obtain user info from Google")
             
             id_info = response.json()
-            print(f"DEBUG: Google User Info: {id_info}")
 
             email = id_info.get('email')
             if not email:
@@ -173,9 +256,8 @@ class GoogleLoginView(APIView):
             user = User.objects.filter(email=email).first()
             
             if user:
-                print(f"DEBUG: User found: {user.username}")
+                logger.info("google login", extra={"user": user.pk})
             else:
-                print("DEBUG: Creating new user.")
                 # Create user
                 username = email
                 if User.objects.filter(username=username).exists():
@@ -183,6 +265,7 @@ class GoogleLoginView(APIView):
 
                 password = ''.join(random.choices(string.ascii_letters + string.digits, k=16))
                 user = User.objects.create_user(username=username, email=email, password=password)
+                logger.info("google login created user", extra={"user": user.pk})
             
             # Generate token
             token, _ = Token.objects.get_or_create(user=user)
@@ -190,8 +273,8 @@ class GoogleLoginView(APIView):
             return Response({"user": UserSerializer(user).data, "token": token.key})
             
         except Exception as e:
-            print(f"DEBUG: Error: {e}")
+            logger.warning("google login failed: %s", e)
             return Response({'error': f'Auth Failed: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            print(f"DEBUG: Unexpected Error: {e}")
+            logger.exception("google login error")
             return Response({'error': f'Server Error: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
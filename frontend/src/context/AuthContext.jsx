@@ -53,6 +53,13 @@ export const AuthProvider = ({ children }) => {
   };
 
   const logout = () => {
+    // Revoke the token server-side too (best-effort: log out locally regardless)
+    const token = localStorage.getItem("token");
+    if (token) {
+      axios
+        .post("http://localhost:8000/api/users/logout/", null, { headers: { Authorization: `Token ${token}` } })
+        .catch(() => {});
+    }
     setUser(null);
     localStorage.removeItem("user");
     localStorage.removeItem("token");
@@ -103,8 +110,8 @@ export const AuthProvider = ({ children }) => {
     });
     // adapt file data to what dashboard expects
     return res.data.map(f => ({
-      name: f.file.split("/").pop(),
-      url: f.file,
+      name: f.original_name,
+      url: f.download_url,
       date: new Date(f.uploaded_at).toLocaleString(),
       size: 0, // optional — your backend doesn’t send file size
     }));
@@ -165,15 +172,34 @@ export const AuthProvider = ({ children }) => {
     }
   };
 
-  const getAdminFiles = async () => {
+  // Paginated: pass the returned nextCursor to fetch the following page
+  const getAdminFiles = async (cursor = null) => {
     const token = localStorage.getItem("token");
     if (!token) throw new Error("Not logged in");
 
     const res = await axios.get("http://localhost:8000/api/users/files/admin/", {
       headers: { Authorization: `Token ${token}` },
+      params: cursor ? { cursor } : {},
     });
 
-    return res.data;
+    return { files: res.data, nextCursor: res.headers["x-next-cursor"] || null };
+  };
+
+  // Stored files are only served to their owner: fetch with the token, then save
+  const downloadFile = async (url, filename) => {
+    const token = localStorage.getItem("token");
+    if (!token) throw new Error("Not logged in");
+
+    const res = await axios.get(`http://localhost:8000${url}`, {
+      headers: { Authorization: `Token ${token}` },
+      responseType: "blob",
+    });
+    const objectUrl = URL.createObjectURL(res.data);
+    const link = document.createElement("a");
+    link.href = objectUrl;
+    link.download = filename;
+    link.click();
+    URL.revokeObjectURL(objectUrl);
   };
 
   // 🔴 ADVANCED PIPELINE FUNCTIONS
@@ -214,10 +240,20 @@ export const AuthProvider = ({ children }) => {
     formData.append("original_file_path", originalPath);
     formData.append("variant_file_path", variantPath);
 
-    const res = await axios.post("http://localhost:8000/api/advanced/analyze/", formData, {
+    // Runs as a background job on the server: submit, then poll until it is over
+    const res = await axios.post("http://localhost:8000/api/advanced/analyze/jobs/", formData, {
       headers: { "Content-Type": "multipart/form-data", Authorization: `Token ${token}` },
     });
-    return res.data;
+    let job = res.data;
+    while (job.status === "queued" || job.status === "running") {
+      await new Promise((resolve) => setTimeout(resolve, 1000));
+      const poll = await axios.get(`http://localhost:8000/api/advanced/analyze/jobs/${job.job_id}/`, {
+        headers: { Authorization: `Token ${token}` },
+      });
+      job = poll.data;
+    }
+    if (job.status !== "done") throw new Error(job.error || "Analysis job failed");
+    return { status: "success", ...job.result };
   };
 
 
@@ -241,6 +277,7 @@ export const AuthProvider = ({ children }) => {
         getStats,
         mutatePayload,
         getAdminFiles,
+        downloadFile,
         startExperiment,
         mutateExperiment,
         analyzeExperiment,
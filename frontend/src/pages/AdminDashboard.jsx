@@ -4,11 +4,12 @@ import { Shield, FileText, User, Download, Search } from "lucide-react";
 import { useNavigate } from "react-router-dom";
 
 export default function AdminDashboard() {
-    const { getProfile, getAdminFiles } = useAuth();
+    const { getProfile, getAdminFiles, downloadFile } = useAuth();
     const navigate = useNavigate();
 
     const [loading, setLoading] = useState(true);
     const [files, setFiles] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
     const [searchTerm, setSearchTerm] = useState("");
 
     useEffect(() => {
@@ -21,8 +22,9 @@ export default function AdminDashboard() {
                     return;
                 }
 
-                const adminFiles = await getAdminFiles();
-                setFiles(adminFiles);
+                const page = await getAdminFiles();
+                setFiles(page.files);
+                setNextCursor(page.nextCursor);
             } catch (err) {
                 console.error("Admin fetch failed:", err);
             } finally {
@@ -32,6 +34,16 @@ export default function AdminDashboard() {
         checkAdmin();
     }, [navigate, getProfile, getAdminFiles]);
 
+    const loadMore = async () => {
+        try {
+            const page = await getAdminFiles(nextCursor);
+            setFiles(prev => [...prev, ...page.files]);
+            setNextCursor(page.nextCursor);
+        } catch (err) {
+            console.error("Admin fetch failed:", err);
+        }
+    };
+
     if (loading) {
         return <div className="min-h-screen flex justify-center items-center bg-gray-950 text-green-400">Loading Admin Panel...</div>;
     }
@@ -92,13 +104,12 @@ export default function AdminDashboard() {
                                         </td>
                                         <td className="p-4 text-gray-500">{file.uploaded_at}</td>
                                         <td className="p-4">
-                                            <a
-                                                href={`http://localhost:8000${file.url}`}
-                                                download
+                                            <button
+                                                onClick={() => downloadFile(file.url, file.filename)}
                                                 className="text-blue-400 hover:text-blue-300 flex items-center gap-1"
                                             >
                                                 <Download size={14} /> Download
-                                            </a>
+                                            </button>
                                         </td>
                                     </tr>
                                 ))}
@@ -107,6 +118,13 @@ export default function AdminDashboard() {
                         {filteredFiles.length === 0 && (
                             <div className="text-center py-10 text-gray-500">No files found.</div>
                         )}
+                        {nextCursor && (
+                            <div className="text-center py-4">
+                                <button onClick={loadMore} className="text-red-400 hover:text-red-300">
+                                    Load more
+                                </button>
+                            </div>
+                        )}
                     </div>
                 </div>
             </div>
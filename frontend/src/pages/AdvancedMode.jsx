@@ -4,7 +4,7 @@ import { useAuth } from "../context/AuthContext";
 import { Upload, FileText, CheckCircle, ArrowRight, Download, Activity, Play, AlertTriangle } from "lucide-react";
 
 export default function AdvancedMode() {
-    const { startExperiment, mutateExperiment, analyzeExperiment } = useAuth();
+    const { startExperiment, mutateExperiment, analyzeExperiment, downloadFile } = useAuth();
 
     // Steps: 1=Upload, 2=Choose Perturbation, 3=Download & Test, 4=Analyze
     const [step, setStep] = useState(1);
@@ -143,9 +143,9 @@ export default function AdvancedMode() {
                             <h2 className="text-2xl font-bold mb-4">Step 3: Test in Sandbox</h2>
                             <div className="bg-gray-800/50 p-6 rounded-xl mb-6">
                                 <p className="text-gray-300 mb-4">Your variant is ready. Download it and run it in your Sandbox (Cuckoo, Any.Run).</p>
-                                <a href={`http://localhost:8000${variantUrl}`} download className="inline-flex items-center gap-2 bg-blue-600 hover:bg-blue-500 px-6 py-3 rounded-lg font-bold text-white transition">
+                                <button onClick={() => downloadFile(variantUrl, variantPath.split("/").pop())} className="inline-flex items-center gap-2 bg-blue-600 hover:bg-blue-500 px-6 py-3 rounded-lg font-bold text-white transition">
                                     <Download size={20} /> Download Variant
-                                </a>
+                                </button>
                             </div>
 
                             <div className="text-left bg-gray-900/50 p-4 rounded text-sm text-gray-400">
@@ -172,7 +172,7 @@ export default function AdvancedMode() {
                                     <h3 className="text-lg font-bold text-red-400 mb-4">Original Malware</h3>
                                     <div className="mb-4">
                                         <label className="block text-sm text-gray-400 mb-1">Excel Report</label>
-                                        <input type="file" onChange={(e) => setExcelOriginal(e.target.files[0])} accept=".xlsx, .xls" className="w-full text-sm text-gray-500" />
+                                        <input type="file" onChange={(e) => setExcelOriginal(e.target.files[0])} accept=".xlsx, .xls, .csv, .json" className="w-full text-sm text-gray-500" />
                                     </div>
                                     <div>
                                         <label className="block text-sm text-gray-400 mb-1">Detection Rate (%)</label>
@@ -184,7 +184,7 @@ export default function AdvancedMode() {
                                     <h3 className="text-lg font-bold text-green-400 mb-4">Variant Malware</h3>
                                     <div className="mb-4">
                                         <label className="block text-sm text-gray-400 mb-1">Excel Report</label>
-                                        <input type="file" onChange={(e) => setExcelVariant(e.target.files[0])} accept=".xlsx, .xls" className="w-full text-sm text-gray-500" />
+                                        <input type="file" onChange={(e) => setExcelVariant(e.target.files[0])} accept=".xlsx, .xls, .csv, .json" className="w-full text-sm text-gray-500" />
                                     </div>
                                     <div>
                                         <label className="block text-sm text-gray-400 mb-1">Detection Rate (%)</label>
@@ -3,7 +3,7 @@ import { useAuth } from "../context/AuthContext";
 import { Upload, FileText, User, Trash2, Download, Shield, Activity, RefreshCw } from "lucide-react";
 
 export default function Dashboard() {
-  const { getProfile, getRecentUploads, uploadFile, mutatePayload } = useAuth();
+  const { getProfile, getRecentUploads, uploadFile, mutatePayload, downloadFile } = useAuth();
 
   const [profile, setProfile] = useState(null);
   const [uploads, setUploads] = useState([]);
@@ -130,13 +130,12 @@ export default function Dashboard() {
                     </div>
                   </div>
 
-                  <a
-                    href={`http://localhost:8000${mutationResult.variant_url}`}
+                  <button
+                    onClick={() => downloadFile(mutationResult.variant_url, mutationResult.variant_name)}
                     className="block w-full bg-green-600 hover:bg-green-500 text-white font-bold py-3 px-4 rounded-lg text-center transition flex justify-center items-center gap-2"
-                    download
                   >
                     <Download size={20} /> Download Evaded Payload
-                  </a>
+                  </button>
                 </div>
               ) : (
                 <div className="text-center text-gray-500">
@@ -162,24 +161,21 @@ export default function Dashboard() {
                   className="flex justify-between items-center bg-gray-800/50 p-3 rounded-lg hover:bg-gray-800"
                 >
                   <div>
-                    <a
-                      href={file.url}
-                      target="_blank"
-                      rel="noreferrer"
+                    <button
+                      onClick={() => downloadFile(file.url, file.name)}
                       className="font-medium hover:underline"
                     >
                       {file.name}
-                    </a>
+                    </button>
                     <p className="text-xs text-gray-500">{file.date}</p>
                   </div>
                   <div className="flex items-center gap-2">
-                    <a
-                      href={file.url}
-                      download
+                    <button
+                      onClick={() => downloadFile(file.url, file.name)}
                       className="text-green-400 hover:text-green-300"
                     >
                       <Download size={18} />
-                    </a>
+                    </button>
                   </div>
                 </li>
               ))}